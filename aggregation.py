@@ -0,0 +1,182 @@
+import numpy as np
+
+# Column keys (same as KEYS in app.js)
+KEYS = {
+    'division': 'Division',
+    'name': 'Solution Name',
+    'focus': 'Focus Area',
+    'stage': 'Stage',
+    'smv': 'SMV Unlock',
+    'oh': 'OH Reduction',
+    'other': 'Other Savings',
+}
+
+# Query parameters accepted by the API (same filters as applyFilters() in app.js)
+FILTER_PARAMS = ('division', 'stage', 'focus', 'search')
+
+# Grouping dimensions, in cube axis order
+DIMENSIONS = ('division', 'stage', 'focus')
+
+# Measures, in the order of the cube's first axis
+METRICS = ('count', 'smv', 'oh', 'other')
+
+
+def filter_rows(dataset, division='', stage='', focus='', search=''):
+    """Indices of the rows matching the dashboard filters"""
+    mask = np.ones(dataset.length, dtype=bool)
+    for key, value in (('division', division), ('stage', stage), ('focus', focus)):
+        if value:
+            labels, codes = dataset.labels(KEYS[key])
+            if value not in labels:
+                return np.empty(0, dtype=np.intp)
+            mask &= codes == labels.index(value)
+
+    search = (search or '').strip().lower()
+    if search:
+        names = np.array([name.lower() for name in dataset.names()], dtype=str)
+        mask &= np.char.find(names, search) >= 0
+    return np.flatnonzero(mask)
+
+
+class Aggregates:
+    """Count and savings per Division, Stage and Focus Area, from one Division x Stage x Focus Area cube"""
+
+    def __init__(self, labels, cube):
+        self.labels = labels    # dimension -> list of labels
+        self.cube = cube        # (metric, division, stage, focus)
+
+    def totals(self, key):
+        """(metric, label) array for one dimension"""
+        axis = 1 + DIMENSIONS.index(key)
+        other_axes = tuple(a for a in (1, 2, 3) if a != axis)
+        return self.cube.sum(axis=other_axes)
+
+    def matrix(self):
+        """(metric, stage, focus) array"""
+        return self.cube.sum(axis=1)
+
+    def grand(self):
+        return self.cube.sum(axis=(1, 2, 3))
+
+    def present(self, key):
+        """Indices of labels that occur in the aggregated rows"""
+        return np.flatnonzero(self.totals(key)[0] > 0)
+
+    def frame(self, key):
+        """pandas DataFrame of one dimension, like df.groupby(...).agg(...) over the savings columns"""
+        import pandas as pd
+        totals = self.totals(key)
+        present = self.present(key)
+        return pd.DataFrame({
+            KEYS[key]: [self.labels[key][i] for i in present],
+            KEYS['smv']: totals[1, present],
+            KEYS['oh']: totals[2, present],
+            KEYS['other']: totals[3, present],
+            'Solution Count': totals[0, present].astype(np.int64),
+        })
+
+
+def aggregate(dataset, rows=None):
+    """Build the full cube with one bincount per metric over combined category codes"""
+    labels = {}
+    combined = np.zeros(dataset.length, dtype=np.int64)
+    shape = []
+    for key in DIMENSIONS:
+        key_labels, codes = dataset.labels(KEYS[key])
+        labels[key] = key_labels
+        size = max(len(key_labels), 1)
+        combined = combined * size + codes
+        shape.append(size)
+
+    if rows is not None:
+        combined = combined[rows]
+        indices = rows
+    else:
+        indices = slice(None)
+
+    cells = int(np.prod(shape))
+    cube = np.empty((len(METRICS), cells), dtype=np.float64)
+    cube[0] = np.bincount(combined, minlength=cells)
+    for m, metric in enumerate(METRICS[1:], 1):
+        cube[m] = np.bincount(combined, weights=dataset.savings(KEYS[metric])[indices], minlength=cells)
+    return Aggregates(labels, cube.reshape(len(METRICS), *shape))
+
+
+def _as_totals(column):
+    count, smv, oh, other = column.tolist()
+    return {'count': int(count), 'smv': smv, 'oh': oh, 'other': other, 'total': smv + oh + other}
+
+
+def group_by(agg, key):
+    """Sum count and savings per normalized value of a column, sorted by label"""
+    totals = agg.totals(key)
+    return {agg.labels[key][i]: _as_totals(totals[:, i]) for i in agg.present(key)}
+
+
+def build_kpis(agg):
+    """Overall totals for the KPI cards"""
+    return _as_totals(agg.grand())
+
+
+def build_summary(agg):
+    """KPIs plus Division, Stage and Focus Area summaries"""
+    return {
+        'kpis': build_kpis(agg),
+        'division': group_by(agg, 'division'),
+        'stage': group_by(agg, 'stage'),
+        'focus': group_by(agg, 'focus'),
+    }
+
+
+def build_matrix(agg):
+    """Stage x Focus Area matrix with row, column and grand totals"""
+    matrix = agg.matrix()
+    stage_idx = agg.present('stage')
+    focus_idx = agg.present('focus')
+    stages = [agg.labels['stage'][i] for i in stage_idx]
+    focuses = [agg.labels['focus'][i] for i in focus_idx]
+
+    cells = {s: {f: _as_totals(matrix[:, si, fi]) for f, fi in zip(focuses, focus_idx)}
+             for s, si in zip(stages, stage_idx)}
+
+    return {
+        'stages': stages,
+        'focuses': focuses,
+        'cells': cells,
+        'stage_totals': group_by(agg, 'stage'),
+        'focus_totals': group_by(agg, 'focus'),
+        'grand': build_kpis(agg),
+    }
+
+
+def build_rankings(agg):
+    """Divisions ranked by total savings, with the insights panel values"""
+    groups = group_by(agg, 'division')
+    ranked = sorted(groups.items(), key=lambda item: item[1]['total'], reverse=True)
+    rankings = [dict(rank=i + 1, division=div, **totals) for i, (div, totals) in enumerate(ranked)]
+
+    insights = {}
+    if groups:
+        def best(metric):
+            return max(groups.items(), key=lambda item: item[1][metric])
+
+        most = best('count')
+        # Stage labels differing only in case count together, like stageCount() in app.js
+        stages = {}
+        for label, totals in group_by(agg, 'stage').items():
+            stages[label.lower()] = stages.get(label.lower(), 0) + totals['count']
+        insights = {
+            'top_division': ranked[0][0],
+            'best_smv': best('smv')[0],
+            'best_oh': best('oh')[0],
+            'most_solutions': {'division': most[0], 'count': most[1]['count']},
+            'commercialized': stages.get('commercialized', 0),
+            'rnd': stages.get('r&d', 0),
+        }
+
+    return {'rankings': rankings, 'insights': insights}
+
+
+def filter_options(dataset):
+    """Distinct values for the Division, Stage and Focus Area dropdowns"""
+    return {key: dataset.labels(KEYS[key])[0] for key in DIMENSIONS}
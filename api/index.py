@@ -1,10 +1,13 @@
-from flask import Flask, render_template_string, request, redirect, url_for, session, send_file, jsonify, Response
+from flask import Flask, render_template_string, request, redirect, url_for, session, send_file, jsonify
 from functools import wraps
+import io
 import os
+import sys
 import json
 
 app = Flask(__name__)
 app.secret_key = 'solution-dashboard-secret-key-2024'
+app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # Reject oversized uploads with 413
 
 # Authentication credentials
 USERS = {
@@ -14,11 +17,28 @@ USERS = {
 # Get the base directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 EXCEL_FILE = os.path.join(BASE_DIR, 'Solution List.xlsx')
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Shared modules live in the project root
+sys.path.insert(0, BASE_DIR)
+import data_store
+import request_metrics
+import static_assets
+
+# Parsed workbook shared by every read route; re-parsed only when the file changes
+store = data_store.get_store(EXCEL_FILE)
+
+# Static files indexed once at startup; small hot files are served from memory
+static_index = static_assets.StaticIndex(BASE_DIR)
+
+# Per-route latency, size and status counts on /metrics (per instance on Vercel)
+request_metrics.install(app)
 
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'logged_in' not in session:
+            request_metrics.login_redirect()
             return redirect('/login')
         return f(*args, **kwargs)
     return decorated_function
@@ -90,15 +110,17 @@ def logout():
 @app.route('/')
 @login_required
 def dashboard():
-    index_path = os.path.join(BASE_DIR, 'index.html')
-    with open(index_path, 'r', encoding='utf-8') as f:
-        return f.read()
+    return static_index.send('index.html') or ('Not found', 404)
 
 @app.route('/download-excel')
 @login_required
 def download_excel():
     if os.path.exists(EXCEL_FILE):
-        return send_file(EXCEL_FILE, as_attachment=True, download_name='Solution List.xlsx')
+        dataset = store.get()
+        # Strong validators so unchanged workbooks are answered with 304 Not Modified
+        return send_file(io.BytesIO(dataset.content), mimetype=XLSX_MIMETYPE,
+                         as_attachment=True, download_name='Solution List.xlsx',
+                         etag=dataset.sha256, last_modified=dataset.mtime, conditional=True)
     return jsonify({'error': 'File not found'}), 404
 
 @app.route('/upload-excel', methods=['POST'])
@@ -110,10 +132,18 @@ def upload_excel():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
     if file and file.filename.endswith('.xlsx'):
-        file.save(EXCEL_FILE)
-        return jsonify({'success': True, 'message': 'File uploaded successfully!'})
+        try:
+            version = store.replace(file.stream)
+        except data_store.UploadError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'success': True, 'message': 'File uploaded successfully!', 'version': version})
     return jsonify({'error': 'Invalid file type. Please upload an Excel file (.xlsx)'}), 400
 
+@app.route('/api/cache-stats')
+@login_required
+def api_cache_stats():
+    return jsonify(store.snapshot_stats())
+
 @app.route('/check-auth')
 def check_auth():
     if 'logged_in' in session:
@@ -123,22 +153,7 @@ def check_auth():
 @app.route('/<path:filename>')
 @login_required
 def serve_static(filename):
-    file_path = os.path.join(BASE_DIR, filename)
-    if os.path.exists(file_path):
-        # Determine content type
-        content_type = 'text/plain'
-        if filename.endswith('.html'):
-            content_type = 'text/html'
-        elif filename.endswith('.css'):
-            content_type = 'text/css'
-        elif filename.endswith('.js'):
-            content_type = 'application/javascript'
-        elif filename.endswith('.xlsx'):
-            content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-
-        with open(file_path, 'rb') as f:
-            return Response(f.read(), mimetype=content_type)
-    return 'Not found', 404
+    return static_index.send(filename) or ('Not found', 404)
 
 # Vercel handler
 app = app
@@ -0,0 +1,82 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import aggregation
+import data_store
+from create_dashboard import build_dashboard
+
+SOURCE_FILE = 'Solution List.xlsx'
+OUTPUT_DIR = 'dashboards'
+
+
+def _slug(label):
+    return re.sub(r'[^A-Za-z0-9]+', '_', label).strip('_') or 'Unspecified'
+
+
+def plan(dataset, output_dir=OUTPUT_DIR):
+    """(output path, dashboard title, Dataset slice) for the global workbook and one per Division
+
+    Divisions whose names slug the same ("A&B", "A B") get numbered file names.
+    """
+    jobs = [(os.path.join(output_dir, 'Solution_Dashboard.xlsx'), "SOLUTION SAVINGS DASHBOARD",
+             dataset.take(range(dataset.length)))]
+    used = {'solution_dashboard'}
+    for division in aggregation.filter_options(dataset)['division']:
+        rows = aggregation.filter_rows(dataset, division=division)
+        if len(rows):
+            stem = base = f'Solution_Dashboard_{_slug(division)}'
+            n = 1
+            while stem.casefold() in used:     # also distinct on case-insensitive filesystems
+                n += 1
+                stem = f'{base}_{n}'
+            used.add(stem.casefold())
+            jobs.append((os.path.join(output_dir, f'{stem}.xlsx'),
+                         f"{division.upper()} SAVINGS DASHBOARD", dataset.take(rows)))
+    return jobs
+
+
+def _build(job, stream):
+    # Runs in a worker: the Dataset slice arrives pickled, without the source .xlsx bytes
+    path, title, dataset = job
+    start = time.perf_counter()
+    build_dashboard(dataset, path, stream=stream, title=title)
+    return path, dataset.length, time.perf_counter() - start
+
+
+def generate(dataset, output_dir=OUTPUT_DIR, jobs=None, stream=False):
+    """Build all dashboard variants across a process pool; yields (path, rows, seconds) as each finishes"""
+    os.makedirs(output_dir, exist_ok=True)
+    work = plan(dataset, output_dir)
+    if jobs == 1:
+        for job in work:
+            yield _build(job, stream)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_build, job, stream) for job in work]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the global dashboard plus one dashboard per Division")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count; 1 builds in this process)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help=f"where to write the workbooks (default: {OUTPUT_DIR})")
+    parser.add_argument('--source', default=SOURCE_FILE, help=f"source workbook (default: {SOURCE_FILE})")
+    parser.add_argument('--stream', action='store_true', help="write-only workbooks for large sheets")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dataset = data_store.get_store(args.source).get()
+    print(f"Loaded {dataset.length} rows from {args.source}")
+
+    for path, rows, seconds in generate(dataset, args.output_dir, max(args.jobs, 1), args.stream):
+        print(f"  {path:<50} {rows:>8} rows  {seconds:6.2f}s")
+    print(f"\nDone in {time.perf_counter() - start:.2f}s with {max(args.jobs, 1)} job(s)")
+
+
+if __name__ == "__main__":
+    main()
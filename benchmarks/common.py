@@ -0,0 +1,72 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+SOURCE_FILE = 'Solution List.xlsx'
+
+
+def parse_size(text):
+    """'100', '10k', '1M' -> int"""
+    text = text.strip().lower()
+    scale = {'k': 1000, 'm': 1000 * 1000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def size_label(count):
+    for suffix, scale in (('M', 1000 * 1000), ('k', 1000)):
+        if count >= scale and count % scale == 0:
+            return f'{count // scale}{suffix}'
+    return str(count)
+
+
+@contextmanager
+def workdir(source):
+    """Temporary working directory holding a copy of source as Solution List.xlsx"""
+    path = tempfile.mkdtemp(prefix='solution-bench-')
+    try:
+        shutil.copyfile(source, os.path.join(path, SOURCE_FILE))
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def latency_stats(samples, elapsed=None):
+    """Summary of request latencies in seconds"""
+    if not samples:
+        return {'requests': 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    stats = {
+        'requests': len(ordered),
+        'mean': sum(ordered) / len(ordered),
+        'p50': pct(50),
+        'p95': pct(95),
+        'p99': pct(99),
+        'max': ordered[-1],
+    }
+    if elapsed:
+        stats['rps'] = len(ordered) / elapsed
+    return stats
+
+
+def run_child(script, args, cwd):
+    """Run a benchmark script in a fresh interpreter and return the JSON it prints last"""
+    cmd = [sys.executable, os.path.join(BENCH_DIR, script)] + [str(a) for a in args]
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    result = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'{script} {" ".join(map(str, args))} failed:\n{result.stderr[-2000:]}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,81 @@
+"""Compare two benchmark result files against the thresholds; exits 1 on any regression
+
+    python benchmarks/compare.py baseline.json results.json [--thresholds benchmarks/thresholds.json]
+"""
+import argparse
+import json
+import os
+import sys
+from fnmatch import fnmatchcase
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thresholds.json')
+
+
+def flatten(results, prefix=''):
+    """{'a': {'b': 1}} -> {'a.b': 1}, numbers only, 'meta' left out"""
+    flat = {}
+    for key, value in results.items():
+        if not prefix and key == 'meta':
+            continue
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{name}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def rule_for(metric, rules):
+    for rule in rules:
+        if fnmatchcase(metric, rule['pattern']):
+            return rule
+    return None
+
+
+def regressed(base, current, rule):
+    worse, better = (base, current) if rule.get('higher_is_better') else (current, base)
+    if worse - better <= rule.get('min_delta', 0):
+        return False
+    return better == 0 or worse / better > rule.get('max_ratio', 1.0)
+
+
+def compare(baseline, current, rules):
+    """[(metric, base, current, rule, regressed)] for metrics present in both files"""
+    base_flat, cur_flat = flatten(baseline), flatten(current)
+    rows = []
+    for metric in sorted(base_flat.keys() & cur_flat.keys()):
+        rule = rule_for(metric, rules)
+        base, cur = base_flat[metric], cur_flat[metric]
+        rows.append((metric, base, cur, rule, rule is not None and regressed(base, cur, rule)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE)
+    parser.add_argument('--all', action='store_true', help="list every metric, not only regressions")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    with open(args.thresholds) as f:
+        rules = json.load(f)['rules']
+
+    rows = compare(baseline, current, rules)
+    failures = [row for row in rows if row[4]]
+    print(f"{baseline['meta'].get('commit')} -> {current['meta'].get('commit')}: "
+          f"{len(rows)} metrics, {len(failures)} regression(s)")
+    for metric, base, cur, rule, bad in rows:
+        if bad or args.all:
+            change = f'{cur / base:6.2f}x' if base else '     - '
+            flag = 'REGRESSION' if bad else ('' if rule else '(no threshold)')
+            print(f"  {metric:<60} {base:12.4f} -> {cur:12.4f}  {change}  {flag}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
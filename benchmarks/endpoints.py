@@ -0,0 +1,223 @@
+"""Child process: load-test the Flask routes from the current directory and print latency stats as JSON"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+from common import REPO_DIR, SOURCE_FILE, latency_stats
+
+import build_assets
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# name -> (method, path, extra headers); uploads run fewer times, they rewrite the workbook
+ROUTES = {
+    'index': ('GET', '/', {}),
+    'download_excel': ('GET', '/download-excel', {}),
+    'upload_excel': ('POST', '/upload-excel', {}),
+    'static_css': ('GET', '/styles.css', {}),
+    'static_js_gzip': ('GET', '/app.js', {'Accept-Encoding': 'gzip'}),
+}
+UPLOAD_SHARE = 10
+
+# name -> (header, value) every response must carry
+EXPECTED_HEADERS = {
+    'static_js_gzip': ('Content-Encoding', 'gzip'),
+}
+
+
+def _routes():
+    """ROUTES with static files under their content-hashed build names, the ones served precompressed"""
+    manifest = build_assets.ensure_built(REPO_DIR)
+    if manifest is None:
+        raise RuntimeError('static build unavailable: run build_assets.py')
+    files = manifest['files']
+    routes = {}
+    for name, (method, path, headers) in ROUTES.items():
+        info = files.get(path.lstrip('/'))
+        routes[name] = (method, '/' + info['name'] if info else path, headers)
+    return routes
+
+
+def _check_headers(name, path, getheader):
+    expected = EXPECTED_HEADERS.get(name)
+    if expected and getheader(expected[0]) != expected[1]:
+        return f'{path} was served without {expected[0]}: {expected[1]}'
+    return None
+
+
+def _multipart(filename, content):
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: {XLSX_MIMETYPE}\r\n\r\n').encode() + content + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def _iterations(name, requests):
+    return max(1, requests // UPLOAD_SHARE) if name == 'upload_excel' else requests
+
+
+# ==================== FLASK TEST CLIENT ====================
+
+def bench_test_client(requests):
+    """In-process: routing, auth and handler cost without a network stack"""
+    import io
+    import server
+
+    with open(SOURCE_FILE, 'rb') as f:
+        content = f.read()
+
+    client = server.app.test_client()
+    with client.session_transaction() as sess:
+        sess['logged_in'] = True
+        sess['username'] = 'bench'
+
+    results = {}
+    for name, (method, path, headers) in _routes().items():
+        samples = []
+        for _ in range(_iterations(name, requests)):
+            start = time.perf_counter()
+            if name == 'upload_excel':
+                response = client.post(path, data={'file': (io.BytesIO(content), SOURCE_FILE)},
+                                       content_type='multipart/form-data')
+            else:
+                response = client.open(path, method=method, headers=headers)
+            response.get_data()
+            samples.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(f'{path} returned {response.status_code}')
+            error = _check_headers(name, path, response.headers.get)
+            if error:
+                raise RuntimeError(error)
+        results[name] = latency_stats(samples, sum(samples))
+    return results
+
+
+# ==================== GUNICORN ====================
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port, proc, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with {proc.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('gunicorn did not start')
+
+
+def _login(port):
+    import server
+    username, password = next(iter(server.USERS.items()))
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/login', urlencode({'username': username, 'password': password}),
+                 {'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    cookie = response.getheader('Set-Cookie')
+    if not cookie:
+        raise RuntimeError('login failed')
+    return cookie.split(';', 1)[0]
+
+
+def _load(port, cookie, name, method, path, headers, body, count, concurrency):
+    """count requests over concurrency keep-alive connections; returns (latencies, elapsed)"""
+    samples, errors = [], []
+    lock = threading.Lock()
+    remaining = [count]
+    headers = dict(headers, Cookie=cookie)
+
+    def worker():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    break
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(str(e))
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.status >= 400:
+                    errors.append(f'{path} returned {response.status}')
+                error = _check_headers(name, path, response.getheader)
+                if error:
+                    errors.append(error)
+                samples.append(elapsed)
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start, errors
+
+
+def bench_gunicorn(requests, concurrency, workers):
+    """Through a local gunicorn with the repo's gunicorn.conf.py"""
+    port = _free_port()
+    cmd = [sys.executable, '-m', 'gunicorn', 'server:app',
+           '--config', os.path.join(REPO_DIR, 'gunicorn.conf.py'),
+           '--pythonpath', REPO_DIR, '--chdir', os.getcwd(),
+           '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning']
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=sys.stderr)
+    try:
+        _wait_ready(port, proc)
+        cookie = _login(port)
+        with open(SOURCE_FILE, 'rb') as f:
+            upload_body, upload_type = _multipart(SOURCE_FILE, f.read())
+
+        results = {}
+        for name, (method, path, headers) in _routes().items():
+            body = None
+            if name == 'upload_excel':
+                body, headers = upload_body, dict(headers, **{'Content-Type': upload_type})
+            samples, elapsed, errors = _load(port, cookie, name, method, path, headers, body,
+                                             _iterations(name, requests), concurrency)
+            results[name] = latency_stats(samples, elapsed)
+            results[name]['errors'] = len(errors)
+        return results
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('mode', choices=('test_client', 'gunicorn'))
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    if args.mode == 'test_client':
+        result = bench_test_client(args.requests)
+    else:
+        result = bench_gunicorn(args.requests, args.concurrency, args.workers)
+    print(json.dumps(result))
@@ -0,0 +1,31 @@
+"""Child process: run one report generator's main() in the current directory and print its phase timings as JSON"""
+import argparse
+import contextlib
+import importlib
+import json
+import resource
+import sys
+
+import common  # noqa: F401  (puts the repo on sys.path)
+import profiling
+
+GENERATORS = ('create_dashboard', 'create_dynamic_dashboard')
+
+
+def run(name, stream=False, memory=False):
+    module = importlib.import_module(name)
+    # The generators report to stdout; keep it free for the JSON result
+    with contextlib.redirect_stdout(sys.stderr), profiling.recording(memory) as recorder:
+        module.main(stream=stream)
+    result = recorder.report()
+    result['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('generator', choices=GENERATORS)
+    parser.add_argument('--stream', action='store_true')
+    parser.add_argument('--trace-memory', action='store_true')
+    args = parser.parse_args()
+    print(json.dumps(run(args.generator, args.stream, args.trace_memory)))
@@ -0,0 +1,112 @@
+"""Benchmark the report generators and the Flask endpoints on synthetic data; writes results as JSON
+
+    python benchmarks/run.py --sizes 100,10k --output results.json
+    python benchmarks/compare.py baseline.json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from common import REPO_DIR, parse_size, run_child, size_label, workdir
+import synth
+from generators import GENERATORS
+
+DEFAULT_SIZES = '100,10k,100k,1M'
+SUITES = ('generators', 'endpoints')
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def meta():
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def bench_generators(sizes, stream=False, memory=False):
+    """generator -> size label -> {phases, total, max_rss_mb}; each run in a fresh process and directory"""
+    results = {name: {} for name in GENERATORS}
+    for size in sizes:
+        source = synth.cached_workbook(size)
+        for name in GENERATORS:
+            with workdir(source) as cwd:
+                args = [name] + (['--stream'] if stream else []) + (['--trace-memory'] if memory else [])
+                result = run_child('generators.py', args, cwd)
+            results[name][size_label(size)] = result
+            log(f"  {name:<26} {size_label(size):>5}  {result['total']['wall']:8.2f}s  "
+                f"{result['max_rss_mb']:7.1f} MB")
+    return results
+
+
+def bench_endpoints(size, requests, concurrency, workers, gunicorn=True):
+    """mode -> route -> latency stats, against a workbook of the given size"""
+    source = synth.cached_workbook(size)
+    modes = ['test_client'] + (['gunicorn'] if gunicorn else [])
+    results = {}
+    for mode in modes:
+        with workdir(source) as cwd:
+            args = [mode, '--requests', requests, '--concurrency', concurrency, '--workers', workers]
+            results[mode] = run_child('endpoints.py', args, cwd)
+        for route, stats in results[mode].items():
+            log(f"  {mode:<12} {route:<16} p50 {stats['p50'] * 1000:8.2f} ms  "
+                f"p95 {stats['p95'] * 1000:8.2f} ms  {stats.get('rps', 0):8.1f} req/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard generators and Flask endpoints")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f"comma-separated row counts for the generators (default: {DEFAULT_SIZES})")
+    parser.add_argument('--suites', default=','.join(SUITES), help="comma-separated subset of: " + ', '.join(SUITES))
+    parser.add_argument('--stream', action='store_true', help="run the generators in --stream mode")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record the tracemalloc peak of each generator phase (slows the runs down)")
+    parser.add_argument('--endpoint-rows', default='10k', help="rows in the workbook served to the endpoints (default: 10k)")
+    parser.add_argument('--requests', type=int, default=200, help="requests per route (uploads: a tenth)")
+    parser.add_argument('--concurrency', type=int, default=8, help="client connections against gunicorn")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument('--no-gunicorn', action='store_true', help="only use Flask's test client")
+    parser.add_argument('--output', '-o', default='benchmark_results.json', help="where to write the JSON results")
+    args = parser.parse_args()
+
+    suites = [s.strip() for s in args.suites.split(',') if s.strip()]
+    for suite in suites:
+        if suite not in SUITES:
+            parser.error(f"unknown suite: {suite}")
+
+    results = {'meta': meta()}
+    if 'generators' in suites:
+        sizes = [parse_size(s) for s in args.sizes.split(',')]
+        log(f"Generators ({', '.join(size_label(s) for s in sizes)} rows)")
+        results['generators'] = bench_generators(sizes, args.stream, args.trace_memory)
+    if 'endpoints' in suites:
+        rows = parse_size(args.endpoint_rows)
+        log(f"Endpoints ({size_label(rows)} rows)")
+        results['endpoints'] = bench_endpoints(rows, args.requests, args.concurrency, args.workers,
+                                               not args.no_gunicorn)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    log(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
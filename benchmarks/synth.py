@@ -0,0 +1,53 @@
+import os
+import random
+
+from openpyxl import Workbook
+
+# Same header cells as the real sheet, trailing spaces included
+HEADER = ('Division ', 'Solution Name', 'Focus Area', 'Stage', 'SMV Unlock', 'OH Reduction', 'Other Savings ')
+
+# Category values and weights seen in the real Solution List.xlsx
+DIVISIONS = (('Intimates', 4), ('Active', 7), ('Kreeda', 6), ('Bodyline', 1), ('Linea Aqua', 10))
+FOCUS_AREAS = (('Manufacturing Technology', 5), ('Cutting Technology', 12), ('Sewing and Finishing', 11))
+STAGES = (('R&D', 17), ('Trial', 8), ('Commercialized', 3))
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+
+def _picker(rng, choices):
+    values = [value for value, _ in choices]
+    weights = [weight for _, weight in choices]
+    return lambda: rng.choices(values, weights)[0]
+
+
+def rows(count, seed=0):
+    """Synthetic data rows shaped like the real sheet: blanks included, Other Savings mostly empty"""
+    rng = random.Random(seed)
+    division, focus, stage = _picker(rng, DIVISIONS), _picker(rng, FOCUS_AREAS), _picker(rng, STAGES)
+    for i in range(count):
+        smv = round(rng.uniform(0.001, 0.25), 3) if rng.random() < 0.9 else None
+        oh = rng.randint(0, 4) if rng.random() < 0.8 else None
+        other = round(rng.uniform(0, 5), 1) if rng.random() < 0.05 else None
+        yield (division(), f'Solution {i + 1}', focus(), stage(), smv, oh, other)
+
+
+def write_workbook(path, count, seed=0):
+    """Write a Solution List.xlsx-shaped workbook with count data rows"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append(HEADER)
+    for row in rows(count, seed):
+        ws.append(row)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    wb.save(tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def cached_workbook(count, seed=0):
+    """Path of a synthetic workbook with count rows, generated once and kept in benchmarks/.cache"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f'solution_list_{count}_{seed}.xlsx')
+    if not os.path.exists(path):
+        write_workbook(path, count, seed)
+    return path
@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Long-lived bundles: content-hashed names, served with immutable caching
+ASSETS = ('app.js', 'data_model.js', 'data_worker.js', 'styles.css', 'xlsx.full.min.js')
+
+# Pages that reference the bundles: copied with hashed references, never renamed
+PAGES = ('dashboard.html', 'login.html', 'index.html')
+
+BUILD_DIR = 'static_build'
+MANIFEST = 'manifest.json'
+
+# Precompressed variants: content-coding -> file suffix
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hashed_name(name, digest):
+    base, ext = os.path.splitext(name)
+    return f'{base}.{digest[:10]}{ext}'
+
+
+def _write(path, data):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_variants(path, data):
+    _write(path, data)
+    _write(path + ENCODINGS['gzip'], gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write(path + ENCODINGS['br'], brotli.compress(data, quality=11))
+
+
+def source_digests(root):
+    """sha256 of every asset and page present under root"""
+    digests = {}
+    for name in ASSETS + PAGES:
+        path = os.path.join(root, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digests[name] = _sha256(f.read())
+    return digests
+
+
+def build(root):
+    """Write hashed, precompressed copies of the static files to root/BUILD_DIR and return the manifest"""
+    out_dir = os.path.join(root, BUILD_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    files = {}
+
+    for name in ASSETS:
+        path = os.path.join(root, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = _sha256(data)
+        hashed = _hashed_name(name, digest)
+        _write_variants(os.path.join(out_dir, hashed), data)
+        files[name] = {'name': hashed, 'sha256': digest, 'immutable': True}
+
+    for name in PAGES:
+        path = os.path.join(root, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            source = f.read()
+        data = source.decode('utf-8')
+        for asset, info in files.items():
+            data = data.replace(f'"{asset}"', f'"{info["name"]}"')
+        _write_variants(os.path.join(out_dir, name), data.encode('utf-8'))
+        files[name] = {'name': name, 'sha256': _sha256(source), 'immutable': False}
+
+    manifest = {'brotli': brotli is not None, 'files': files}
+    _write(os.path.join(out_dir, MANIFEST), json.dumps(manifest, indent=2).encode('utf-8'))
+
+    # Drop bundles from previous builds
+    keep = {MANIFEST} | {info['name'] + suffix for info in files.values() for suffix in ('', *ENCODINGS.values())}
+    for name in os.listdir(out_dir):
+        if name not in keep and not name.endswith('.tmp'):
+            os.remove(os.path.join(out_dir, name))
+    return manifest
+
+
+def load_manifest(root):
+    """The manifest of an existing build, or None"""
+    try:
+        with open(os.path.join(root, BUILD_DIR, MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_built(root):
+    """Return an up-to-date manifest, rebuilding if sources changed; None if the build can't be written"""
+    manifest = load_manifest(root)
+    current = source_digests(root)
+    if manifest is not None and manifest.get('brotli') == (brotli is not None):
+        recorded = {name: info['sha256'] for name, info in manifest['files'].items()}
+        if recorded == current:
+            return manifest
+    try:
+        return build(root)
+    except OSError:
+        return None
+
+
+def main():
+    root = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    manifest = build(root)
+    out_dir = os.path.join(root, BUILD_DIR)
+    print(f"Static assets written to {out_dir}")
+    for name, info in manifest['files'].items():
+        path = os.path.join(out_dir, info['name'])
+        sizes = [f"{os.path.getsize(path):>9,} raw"]
+        for encoding, suffix in ENCODINGS.items():
+            if os.path.exists(path + suffix):
+                sizes.append(f"{os.path.getsize(path + suffix):>9,} {encoding}")
+        print(f"  {info['name']:<32} {'  '.join(sizes)}")
+    if brotli is None:
+        print("\nbrotli not installed: only gzip variants were written")
+
+
+if __name__ == "__main__":
+    main()
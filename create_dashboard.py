@@ -1,4 +1,3 @@
-import pandas as pd
 import openpyxl
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, Fill, PatternFill, Border, Side, Alignment, GradientFill
@@ -8,10 +7,18 @@ from openpyxl.chart.series import DataPoint
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.formatting.rule import ColorScaleRule, DataBarRule
 from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
 from copy import copy
+import argparse
 import warnings
 warnings.filterwarnings('ignore')
 
+import aggregation
+import data_store
+import profiling
+import report_styles as rs
+import sheet_writer
+
 # Color palette (Power BI inspired)
 COLORS = {
     'primary': '118DFF',      # Blue
@@ -35,15 +42,9 @@ def create_kpi_card(ws, start_row, start_col, title, formula, color, width=3):
     end_col = start_col + width - 1
 
     # Card background
-    card_fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
-    white_fill = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
-
-    thin_border = Border(
-        left=Side(style='thin', color='DDDDDD'),
-        right=Side(style='thin', color='DDDDDD'),
-        top=Side(style='thin', color='DDDDDD'),
-        bottom=Side(style='thin', color='DDDDDD')
-    )
+    card_fill = rs.solid_fill(color)
+    white_fill = rs.solid_fill('FFFFFF')
+    thin_border = rs.box_border('DDDDDD')
 
     # Top colored bar
     for col in range(start_col, end_col + 1):
@@ -56,8 +57,8 @@ def create_kpi_card(ws, start_row, start_col, title, formula, color, width=3):
     ws.merge_cells(start_row=start_row+1, start_column=start_col, end_row=start_row+1, end_column=end_col)
     title_cell = ws.cell(row=start_row+1, column=start_col)
     title_cell.value = title
-    title_cell.font = Font(name='Segoe UI', size=10, color='666666')
-    title_cell.alignment = Alignment(horizontal='center', vertical='center')
+    title_cell.font = rs.font(name='Segoe UI', size=10, color='666666')
+    title_cell.alignment = rs.align()
     title_cell.fill = white_fill
     ws.row_dimensions[start_row+1].height = 25
 
@@ -69,8 +70,8 @@ def create_kpi_card(ws, start_row, start_col, title, formula, color, width=3):
     ws.merge_cells(start_row=start_row+2, start_column=start_col, end_row=start_row+2, end_column=end_col)
     value_cell = ws.cell(row=start_row+2, column=start_col)
     value_cell.value = formula
-    value_cell.font = Font(name='Segoe UI Semibold', size=24, color=color, bold=True)
-    value_cell.alignment = Alignment(horizontal='center', vertical='center')
+    value_cell.font = rs.font(name='Segoe UI Semibold', size=24, color=color, bold=True)
+    value_cell.alignment = rs.align()
     value_cell.fill = white_fill
     ws.row_dimensions[start_row+2].height = 50
 
@@ -90,13 +91,25 @@ def create_section_header(ws, row, col, end_col, title):
     ws.merge_cells(start_row=row, start_column=col, end_row=row, end_column=end_col)
     cell = ws.cell(row=row, column=col)
     cell.value = title
-    cell.font = Font(name='Segoe UI Semibold', size=14, color='252423', bold=True)
-    cell.alignment = Alignment(horizontal='left', vertical='center')
+    cell.font = rs.font(name='Segoe UI Semibold', size=14, color='252423', bold=True)
+    cell.alignment = rs.align('left')
     ws.row_dimensions[row].height = 35
 
-def main():
-    # Load existing data
-    df = pd.read_excel('Solution List.xlsx')
+def style_data_header(cell):
+    rs.apply(cell, 'Dashboard Data Header',
+             font=rs.font(name='Segoe UI', size=11, bold=True, color='FFFFFF'),
+             fill=rs.solid_fill('118DFF'), alignment=rs.align(),
+             border=rs.bottom_border('DDDDDD'))
+
+def style_data_cell(cell):
+    rs.apply(cell, 'Dashboard Data',
+             font=rs.font(name='Segoe UI', size=10), alignment=rs.align(),
+             border=rs.bottom_border('DDDDDD'))
+
+def build_dashboard(dataset, output='Solution_Dashboard.xlsx', stream=False, title="SOLUTION SAVINGS DASHBOARD"):
+    """Write the dashboard workbook for a Dataset and return its summary statistics"""
+    profiling.begin('read')
+    df = dataset.to_dataframe()
     df.columns = df.columns.str.strip()  # Remove whitespace from column names
 
     # Fill NaN with 0 for calculations
@@ -105,102 +118,67 @@ def main():
     df_calc['OH Reduction'] = df_calc['OH Reduction'].fillna(0)
     df_calc['Other Savings'] = df_calc['Other Savings'].fillna(0)
 
+    # Division x Stage x Focus Area totals in one pass
+    profiling.begin('aggregate')
+    agg = aggregation.aggregate(dataset)
+    div_summary = agg.frame('division')
+    div_summary['Total Savings'] = div_summary['SMV Unlock'] + div_summary['OH Reduction'] + div_summary['Other Savings']
+    stage_summary = agg.frame('stage')
+    focus_summary = agg.frame('focus')
+
     # Create workbook
-    wb = Workbook()
+    profiling.begin('style')
+    wb = sheet_writer.new_workbook(stream)
 
     # ========== DATA SHEET ==========
-    ws_data = wb.active
-    ws_data.title = "Data"
-
-    # Write data with formatting
-    for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
-        for c_idx, value in enumerate(row, 1):
-            cell = ws_data.cell(row=r_idx, column=c_idx, value=value)
-            if r_idx == 1:
-                cell.font = Font(name='Segoe UI', size=11, bold=True, color='FFFFFF')
-                cell.fill = PatternFill(start_color='118DFF', end_color='118DFF', fill_type='solid')
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-            else:
-                cell.font = Font(name='Segoe UI', size=10)
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = Border(
-                bottom=Side(style='thin', color='DDDDDD')
-            )
+    ws_data = wb.create_sheet("Data")
 
     # Auto-fit columns
-    for col in range(1, 8):
-        ws_data.column_dimensions[get_column_letter(col)].width = 18
+    sheet_writer.set_widths(ws_data, [18] * 7)
+
+    # Write data with formatting, one row at a time
+    rows = dataframe_to_rows(df, index=False, header=True)
+    ws_data.append(sheet_writer.cells(ws_data, next(rows), style_data_header))
+    for row in rows:
+        ws_data.append(sheet_writer.cells(ws_data, row, style_data_cell))
 
     # ========== PIVOT DATA SHEET (for charts) ==========
     ws_pivot = wb.create_sheet("PivotData")
+    pivot = sheet_writer.RowWriter(ws_pivot)
 
-    # Division Summary
-    div_summary = df_calc.groupby('Division').agg({
-        'SMV Unlock': 'sum',
-        'OH Reduction': 'sum',
-        'Other Savings': 'sum',
-        'Solution Name': 'count'
-    }).reset_index()
-    div_summary.columns = ['Division', 'SMV Unlock', 'OH Reduction', 'Other Savings', 'Solution Count']
-    div_summary['Total Savings'] = div_summary['SMV Unlock'] + div_summary['OH Reduction'] + div_summary['Other Savings']
-
-    ws_pivot['A1'] = 'DIVISION SUMMARY'
-    ws_pivot['A1'].font = Font(bold=True, size=12)
-    for r_idx, row in enumerate(dataframe_to_rows(div_summary, index=False, header=True), 3):
-        for c_idx, value in enumerate(row, 1):
-            ws_pivot.cell(row=r_idx, column=c_idx, value=value)
+    def write_summary(title, summary, title_row):
+        """Section title, then header and values from two rows below; returns the last row"""
+        title_cell = WriteOnlyCell(ws_pivot, title)
+        title_cell.font = rs.font(bold=True, size=12)
+        pivot.append([title_cell], title_row)
+        for r_idx, row in enumerate(dataframe_to_rows(summary, index=False, header=True), title_row + 2):
+            pivot.append(row, r_idx)
+        return title_row + 2 + len(summary)
 
-    div_end_row = 3 + len(div_summary)
+    # Division Summary
+    div_end_row = write_summary('DIVISION SUMMARY', div_summary, 1)
 
     # Stage Summary
-    stage_summary = df_calc.groupby('Stage').agg({
-        'SMV Unlock': 'sum',
-        'OH Reduction': 'sum',
-        'Other Savings': 'sum',
-        'Solution Name': 'count'
-    }).reset_index()
-    stage_summary.columns = ['Stage', 'SMV Unlock', 'OH Reduction', 'Other Savings', 'Solution Count']
-
     stage_start = div_end_row + 3
-    ws_pivot.cell(row=stage_start, column=1, value='STAGE SUMMARY').font = Font(bold=True, size=12)
-    for r_idx, row in enumerate(dataframe_to_rows(stage_summary, index=False, header=True), stage_start + 2):
-        for c_idx, value in enumerate(row, 1):
-            ws_pivot.cell(row=r_idx, column=c_idx, value=value)
-
-    stage_end_row = stage_start + 2 + len(stage_summary)
+    stage_end_row = write_summary('STAGE SUMMARY', stage_summary, stage_start)
 
     # Focus Area Summary
-    focus_summary = df_calc.groupby('Focus Area').agg({
-        'SMV Unlock': 'sum',
-        'OH Reduction': 'sum',
-        'Other Savings': 'sum',
-        'Solution Name': 'count'
-    }).reset_index()
-    focus_summary.columns = ['Focus Area', 'SMV Unlock', 'OH Reduction', 'Other Savings', 'Solution Count']
-
     focus_start = stage_end_row + 3
-    ws_pivot.cell(row=focus_start, column=1, value='FOCUS AREA SUMMARY').font = Font(bold=True, size=12)
-    for r_idx, row in enumerate(dataframe_to_rows(focus_summary, index=False, header=True), focus_start + 2):
-        for c_idx, value in enumerate(row, 1):
-            ws_pivot.cell(row=focus_start + 2 + r_idx - (focus_start + 2), column=c_idx, value=value)
-
-    # Actually write focus area data properly
-    for r_idx, row in enumerate(dataframe_to_rows(focus_summary, index=False, header=True), focus_start + 2):
-        for c_idx, value in enumerate(row, 1):
-            ws_pivot.cell(row=r_idx, column=c_idx, value=value)
-
-    focus_end_row = focus_start + 2 + len(focus_summary)
+    focus_end_row = write_summary('FOCUS AREA SUMMARY', focus_summary, focus_start)
 
     # ========== DASHBOARD SHEET ==========
-    ws_dash = wb.create_sheet("Dashboard")
-    wb.active = ws_dash
+    # Free-form layout: built in memory, then streamed into the write-only workbook
+    if stream:
+        ws_dash = sheet_writer.scratch_sheet("Dashboard")
+    else:
+        ws_dash = wb.create_sheet("Dashboard")
 
     # Set column widths
     for col in range(1, 20):
         ws_dash.column_dimensions[get_column_letter(col)].width = 12
 
     # Background color
-    gray_fill = PatternFill(start_color='F5F5F5', end_color='F5F5F5', fill_type='solid')
+    gray_fill = rs.solid_fill('F5F5F5')
     for row in range(1, 60):
         for col in range(1, 20):
             ws_dash.cell(row=row, column=col).fill = gray_fill
@@ -208,7 +186,7 @@ def main():
     # ========== HEADER ==========
     ws_dash.merge_cells('B2:R2')
     header_cell = ws_dash['B2']
-    header_cell.value = "SOLUTION SAVINGS DASHBOARD"
+    header_cell.value = title
     header_cell.font = Font(name='Segoe UI', size=28, bold=True, color='118DFF')
     header_cell.alignment = Alignment(horizontal='center', vertical='center')
     ws_dash.row_dimensions[2].height = 50
@@ -239,6 +217,7 @@ def main():
                    f"=ROUND(SUM(Data!G2:G{len(df)+1}),1)", COLORS['accent2'], 3)
 
     # ========== CHARTS SECTION ==========
+    profiling.begin('chart')
 
     # --- Division Performance Bar Chart ---
     create_section_header(ws_dash, 11, 2, 8, "Division Performance")
@@ -336,6 +315,7 @@ def main():
     ws_dash.add_chart(chart4, "K29")
 
     # ========== TOP PERFORMERS TABLE ==========
+    profiling.begin('style')
     create_section_header(ws_dash, 45, 2, 10, "Top Performing Divisions")
 
     # Sort divisions by total savings
@@ -343,19 +323,14 @@ def main():
 
     # Table headers
     headers = ['Rank', 'Division', 'SMV Unlock', 'OH Reduction', 'Other Savings', 'Total']
-    header_fill = PatternFill(start_color='118DFF', end_color='118DFF', fill_type='solid')
+    header_fill = rs.solid_fill('118DFF')
 
     for i, header in enumerate(headers):
         cell = ws_dash.cell(row=46, column=2+i, value=header)
-        cell.font = Font(name='Segoe UI', size=10, bold=True, color='FFFFFF')
+        cell.font = rs.font(name='Segoe UI', size=10, bold=True, color='FFFFFF')
         cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.border = Border(
-            left=Side(style='thin', color='CCCCCC'),
-            right=Side(style='thin', color='CCCCCC'),
-            top=Side(style='thin', color='CCCCCC'),
-            bottom=Side(style='thin', color='CCCCCC')
-        )
+        cell.alignment = rs.align()
+        cell.border = rs.box_border('CCCCCC')
 
     ws_dash.row_dimensions[46].height = 25
 
@@ -368,23 +343,18 @@ def main():
                 round(row['OH Reduction'], 1), round(row['Other Savings'], 1),
                 round(row['Total Savings'], 2)]
 
-        row_fill = PatternFill(start_color=rank_colors[min(idx, 4)],
-                               end_color=rank_colors[min(idx, 4)], fill_type='solid')
+        row_fill = rs.solid_fill(rank_colors[min(idx, 4)])
+        row_font = rs.font(name='Segoe UI', size=10,
+                           bold=(idx < 3),
+                           color='252423' if idx < 3 else '666666')
 
         for i, value in enumerate(data):
             cell = ws_dash.cell(row=row_num, column=2+i, value=value)
-            cell.font = Font(name='Segoe UI', size=10,
-                           bold=(idx < 3),
-                           color='252423' if idx < 3 else '666666')
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font = row_font
+            cell.alignment = rs.align()
             if idx < 3:
                 cell.fill = row_fill
-            cell.border = Border(
-                left=Side(style='thin', color='DDDDDD'),
-                right=Side(style='thin', color='DDDDDD'),
-                top=Side(style='thin', color='DDDDDD'),
-                bottom=Side(style='thin', color='DDDDDD')
-            )
+            cell.border = rs.box_border('DDDDDD')
         ws_dash.row_dimensions[row_num].height = 22
 
     # ========== INSIGHTS PANEL ==========
@@ -404,15 +374,15 @@ def main():
         f"Divisions Tracked: {len(div_summary)}"
     ]
 
-    insight_fill = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
+    insight_fill = rs.solid_fill('FFFFFF')
 
     for idx, insight in enumerate(insights):
         row_num = 46 + idx
         ws_dash.merge_cells(start_row=row_num, start_column=11, end_row=row_num, end_column=17)
         cell = ws_dash.cell(row=row_num, column=11, value=f"  {insight}")
-        cell.font = Font(name='Segoe UI', size=11, color='252423')
+        cell.font = rs.font(name='Segoe UI', size=11, color='252423')
         cell.fill = insight_fill
-        cell.alignment = Alignment(horizontal='left', vertical='center')
+        cell.alignment = rs.align('left')
         cell.border = Border(
             left=Side(style='medium', color='118DFF'),
             bottom=Side(style='thin', color='EEEEEE')
@@ -432,20 +402,50 @@ def main():
     # Set print area
     ws_dash.print_area = 'A1:S56'
 
+    if stream:
+        ws_layout, ws_dash = ws_dash, wb.create_sheet("Dashboard")
+        sheet_writer.copy_sheet(ws_layout, ws_dash)
+
     # Move Dashboard to first position
-    wb.move_sheet(ws_dash, offset=-2)
+    wb.move_sheet(ws_dash.title, offset=-2)
+    wb.active = ws_dash
 
     # Save workbook
-    wb.save('Solution_Dashboard.xlsx')
+    profiling.begin('save')
+    wb.save(output)
+    profiling.end()
+
+    return {
+        'solutions': len(df),
+        'smv': df_calc['SMV Unlock'].sum(),
+        'oh': df_calc['OH Reduction'].sum(),
+        'other': df_calc['Other Savings'].sum(),
+        'top_division': top_div,
+        'best_smv': top_smv_div,
+        'best_oh': top_oh_div,
+    }
+
+def main(stream=False):
+    # Load existing data
+    profiling.begin('read')
+    dataset = data_store.get_store('Solution List.xlsx').get()
+    stats = build_dashboard(dataset, 'Solution_Dashboard.xlsx', stream)
+
     print("Dashboard created successfully: Solution_Dashboard.xlsx")
     print(f"\nSummary Statistics:")
-    print(f"  Total Solutions: {len(df)}")
-    print(f"  Total SMV Unlock: {df_calc['SMV Unlock'].sum():.3f}")
-    print(f"  Total OH Reduction: {df_calc['OH Reduction'].sum():.1f}")
-    print(f"  Total Other Savings: {df_calc['Other Savings'].sum():.1f}")
-    print(f"\nTop Division: {top_div}")
-    print(f"Best SMV Unlock Division: {top_smv_div}")
-    print(f"Best OH Reduction Division: {top_oh_div}")
+    print(f"  Total Solutions: {stats['solutions']}")
+    print(f"  Total SMV Unlock: {stats['smv']:.3f}")
+    print(f"  Total OH Reduction: {stats['oh']:.1f}")
+    print(f"  Total Other Savings: {stats['other']:.1f}")
+    print(f"\nTop Division: {stats['top_division']}")
+    print(f"Best SMV Unlock Division: {stats['best_smv']}")
+    print(f"Best OH Reduction Division: {stats['best_oh']}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build Solution_Dashboard.xlsx from Solution List.xlsx")
+    parser.add_argument('--stream', action='store_true',
+                        help="write-only workbook: stream rows to disk so memory stays flat for large sheets")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    with profiling.from_args(args):
+        main(stream=args.stream)
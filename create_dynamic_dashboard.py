@@ -1,4 +1,3 @@
-import pandas as pd
 import openpyxl
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, Fill, PatternFill, Border, Side, Alignment
@@ -8,10 +7,19 @@ from openpyxl.chart.series import DataPoint
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.formatting.rule import ColorScaleRule, DataBarRule, FormulaRule
 from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.drawing.fill import PatternFillProperties, ColorChoice
+import argparse
+from decimal import Decimal, ROUND_HALF_UP
 import warnings
 warnings.filterwarnings('ignore')
 
+import aggregation
+import data_store
+import profiling
+import report_styles as rs
+import sheet_writer
+
 # Power BI Color Palette
 COLORS = {
     'primary': '118DFF',
@@ -27,34 +35,51 @@ COLORS = {
     'gray': '666666',
 }
 
+# Excel Table over the Data sheet; formulas use structured references, so they
+# cover exactly the rows in the table and keep doing so as it grows in Excel
+DATA_TABLE = 'SolutionData'
+
+def data_col(name):
+    """Structured reference to a column of the Data table"""
+    return f'{DATA_TABLE}[{name}]'
+
+def excel_round(value, digits):
+    """ROUND() as Excel does it: halves away from zero"""
+    return float(Decimal(repr(float(value))).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+def criteria_key(value):
+    """How SUMIFS/COUNTIFS match a text criterion against a cell: the exact text, ignoring case"""
+    return value.casefold() if isinstance(value, str) else value
+
+def summarize(df, column, labels):
+    """[SMV, OH, Other, Count, Total] per label, as the SUMIFS/COUNTIFS rows compute them"""
+    keys = df[column].map(criteria_key)
+    sums = df[['SMV Unlock', 'OH Reduction', 'Other Savings']].fillna(0).groupby(keys).sum()
+    counts = keys.value_counts()
+    rows = []
+    for label in labels:
+        key = criteria_key(label)
+        smv, oh, other = sums.loc[key].tolist() if key in sums.index else (0.0, 0.0, 0.0)
+        count = int(counts.get(key, 0))
+        rows.append([smv, oh, other, count, smv + oh + other])
+    return rows
+
 def style_header_cell(cell, bg_color='118DFF'):
-    cell.font = Font(name='Segoe UI', size=10, bold=True, color='FFFFFF')
-    cell.fill = PatternFill(start_color=bg_color, end_color=bg_color, fill_type='solid')
-    cell.alignment = Alignment(horizontal='center', vertical='center')
-    cell.border = Border(
-        left=Side(style='thin', color='CCCCCC'),
-        right=Side(style='thin', color='CCCCCC'),
-        top=Side(style='thin', color='CCCCCC'),
-        bottom=Side(style='thin', color='CCCCCC')
-    )
+    rs.apply(cell, f'Header {bg_color}',
+             font=rs.font(name='Segoe UI', size=10, bold=True, color='FFFFFF'),
+             fill=rs.solid_fill(bg_color), alignment=rs.align(),
+             border=rs.box_border('CCCCCC'))
 
 def style_data_cell(cell, bold=False, color='252423'):
-    cell.font = Font(name='Segoe UI', size=10, bold=bold, color=color)
-    cell.alignment = Alignment(horizontal='center', vertical='center')
-    cell.border = Border(
-        left=Side(style='thin', color='DDDDDD'),
-        right=Side(style='thin', color='DDDDDD'),
-        top=Side(style='thin', color='DDDDDD'),
-        bottom=Side(style='thin', color='DDDDDD')
-    )
+    rs.apply(cell, f'Data {color}{" Bold" if bold else ""}',
+             font=rs.font(name='Segoe UI', size=10, bold=bold, color=color),
+             alignment=rs.align(), border=rs.box_border('DDDDDD'))
 
 def create_kpi_card(ws, row, col, title, formula, accent_color, icon=""):
     """Create a modern KPI card with formula"""
-    white_fill = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
-    accent_fill = PatternFill(start_color=accent_color, end_color=accent_color, fill_type='solid')
-
-    thin = Side(style='thin', color='E0E0E0')
-    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    white_fill = rs.solid_fill('FFFFFF')
+    accent_fill = rs.solid_fill(accent_color)
+    border = rs.box_border('E0E0E0')
 
     # Accent bar (top)
     for c in range(col, col + 3):
@@ -65,8 +90,8 @@ def create_kpi_card(ws, row, col, title, formula, accent_color, icon=""):
     # Title
     ws.merge_cells(start_row=row+1, start_column=col, end_row=row+1, end_column=col+2)
     title_cell = ws.cell(row=row+1, column=col, value=title)
-    title_cell.font = Font(name='Segoe UI', size=9, color='888888')
-    title_cell.alignment = Alignment(horizontal='center', vertical='center')
+    title_cell.font = rs.font(name='Segoe UI', size=9, color='888888')
+    title_cell.alignment = rs.align()
     title_cell.fill = white_fill
     for c in range(col, col + 3):
         ws.cell(row=row+1, column=c).fill = white_fill
@@ -76,8 +101,8 @@ def create_kpi_card(ws, row, col, title, formula, accent_color, icon=""):
     # Value
     ws.merge_cells(start_row=row+2, start_column=col, end_row=row+2, end_column=col+2)
     value_cell = ws.cell(row=row+2, column=col, value=formula)
-    value_cell.font = Font(name='Segoe UI Semibold', size=26, bold=True, color=accent_color)
-    value_cell.alignment = Alignment(horizontal='center', vertical='center')
+    value_cell.font = rs.font(name='Segoe UI Semibold', size=26, bold=True, color=accent_color)
+    value_cell.alignment = rs.align()
     value_cell.fill = white_fill
     for c in range(col, col + 3):
         ws.cell(row=row+2, column=c).fill = white_fill
@@ -91,117 +116,125 @@ def create_kpi_card(ws, row, col, title, formula, accent_color, icon=""):
         cell.border = border
     ws.row_dimensions[row+3].height = 8
 
-def main():
-    # Load existing data
-    df = pd.read_excel('Solution List.xlsx')
+def build_dynamic_dashboard(dataset, output='Solution_Dashboard_Dynamic.xlsx', stream=False, precompute=False):
+    """Write the formula-driven dashboard workbook for a Dataset and return what it tracks"""
+    profiling.begin('read')
+    df = dataset.to_dataframe()
     df.columns = df.columns.str.strip()
 
     # Get unique values for dynamic formulas
+    profiling.begin('aggregate')
     divisions = df['Division'].dropna().unique().tolist()
     stages = df['Stage'].dropna().unique().tolist()
     focus_areas = df['Focus Area'].dropna().unique().tolist()
 
     data_rows = len(df) + 1  # +1 for header
 
+    # Formula results computed in Python, stored next to the formulas with --precompute
+    agg = aggregation.aggregate(dataset)
+    div_values = summarize(df, 'Division', divisions)
+    stage_values = summarize(df, 'Stage', stages)
+    focus_values = summarize(df, 'Focus Area', focus_areas)
+    cached = sheet_writer.CachedValues()
+
     # Create workbook
-    wb = Workbook()
+    profiling.begin('style')
+    wb = sheet_writer.new_workbook(stream)
 
     # ==================== DATA SHEET ====================
-    ws_data = wb.active
-    ws_data.title = "Data"
+    ws_data = wb.create_sheet("Data")
+
+    # Set column widths
+    sheet_writer.set_widths(ws_data, [15, 18, 25, 15, 12, 14, 14])
 
     # Write headers
     headers = ['Division', 'Solution Name', 'Focus Area', 'Stage', 'SMV Unlock', 'OH Reduction', 'Other Savings']
-    for c, header in enumerate(headers, 1):
-        style_header_cell(ws_data.cell(row=1, column=c, value=header))
+    ws_data.append(sheet_writer.cells(ws_data, headers, style_header_cell))
 
-    # Write data
-    for r, row_data in enumerate(df.values, 2):
-        for c, value in enumerate(row_data, 1):
-            cell = ws_data.cell(row=r, column=c, value=value)
-            style_data_cell(cell)
+    # Write data, one row at a time
+    for row_data in df.itertuples(index=False, name=None):
+        ws_data.append(sheet_writer.cells(ws_data, row_data, style_data_cell))
 
-    # Set column widths
-    widths = [15, 18, 25, 15, 12, 14, 14]
-    for c, w in enumerate(widths, 1):
-        ws_data.column_dimensions[get_column_letter(c)].width = w
+    sheet_writer.add_table(ws_data, DATA_TABLE, headers, data_rows)
 
     # ==================== CALCULATIONS SHEET ====================
     ws_calc = wb.create_sheet("Calculations")
+    calc = sheet_writer.RowWriter(ws_calc)
+
+    # Set column widths for calculations
+    sheet_writer.set_widths(ws_calc, [22, 14, 14, 14, 14, 14])
+
+    def section_title(title, row):
+        cell = WriteOnlyCell(ws_calc, title)
+        cell.font = rs.font(bold=True, size=12, color='118DFF')
+        calc.append([cell], row)
 
     # --- Division Summary with SUMIF formulas ---
-    ws_calc['A1'] = 'DIVISION SUMMARY'
-    ws_calc['A1'].font = Font(bold=True, size=12, color='118DFF')
+    section_title('DIVISION SUMMARY', 1)
 
     div_headers = ['Division', 'SMV Unlock', 'OH Reduction', 'Other Savings', 'Solution Count', 'Total Savings']
-    for c, h in enumerate(div_headers, 1):
-        style_header_cell(ws_calc.cell(row=2, column=c, value=h))
+    calc.append(sheet_writer.cells(ws_calc, div_headers, style_header_cell), 2)
 
     for r, div in enumerate(divisions, 3):
-        ws_calc.cell(row=r, column=1, value=div)
-        ws_calc.cell(row=r, column=2, value=f'=SUMIF(Data!$A$2:$A$100,A{r},Data!$E$2:$E$100)')
-        ws_calc.cell(row=r, column=3, value=f'=SUMIF(Data!$A$2:$A$100,A{r},Data!$F$2:$F$100)')
-        ws_calc.cell(row=r, column=4, value=f'=SUMIF(Data!$A$2:$A$100,A{r},Data!$G$2:$G$100)')
-        ws_calc.cell(row=r, column=5, value=f'=COUNTIF(Data!$A$2:$A$100,A{r})')
-        ws_calc.cell(row=r, column=6, value=f'=B{r}+C{r}+D{r}')
-
-        for c in range(1, 7):
-            style_data_cell(ws_calc.cell(row=r, column=c))
+        calc.append(sheet_writer.cells(ws_calc, [
+            div,
+            f'=SUMIFS({data_col("SMV Unlock")},{data_col("Division")},A{r})',
+            f'=SUMIFS({data_col("OH Reduction")},{data_col("Division")},A{r})',
+            f'=SUMIFS({data_col("Other Savings")},{data_col("Division")},A{r})',
+            f'=COUNTIFS({data_col("Division")},A{r})',
+            f'=B{r}+C{r}+D{r}',
+        ], style_data_cell), r)
+        cached.set_row(ws_calc, r, div_values[r - 3], first_col=2)
 
     div_end_row = 2 + len(divisions)
 
     # --- Stage Summary ---
     stage_start = div_end_row + 3
-    ws_calc.cell(row=stage_start, column=1, value='STAGE SUMMARY').font = Font(bold=True, size=12, color='118DFF')
+    section_title('STAGE SUMMARY', stage_start)
 
     stage_headers = ['Stage', 'SMV Unlock', 'OH Reduction', 'Other Savings', 'Solution Count']
-    for c, h in enumerate(stage_headers, 1):
-        style_header_cell(ws_calc.cell(row=stage_start+1, column=c, value=h))
-
-    for r, stage in enumerate(stages, stage_start + 2):
-        row_idx = r
-        ws_calc.cell(row=row_idx, column=1, value=stage)
-        ws_calc.cell(row=row_idx, column=2, value=f'=SUMIF(Data!$D$2:$D$100,A{row_idx},Data!$E$2:$E$100)')
-        ws_calc.cell(row=row_idx, column=3, value=f'=SUMIF(Data!$D$2:$D$100,A{row_idx},Data!$F$2:$F$100)')
-        ws_calc.cell(row=row_idx, column=4, value=f'=SUMIF(Data!$D$2:$D$100,A{row_idx},Data!$G$2:$G$100)')
-        ws_calc.cell(row=row_idx, column=5, value=f'=COUNTIF(Data!$D$2:$D$100,A{row_idx})')
-
-        for c in range(1, 6):
-            style_data_cell(ws_calc.cell(row=row_idx, column=c))
+    calc.append(sheet_writer.cells(ws_calc, stage_headers, style_header_cell), stage_start + 1)
+
+    for row_idx, stage in enumerate(stages, stage_start + 2):
+        calc.append(sheet_writer.cells(ws_calc, [
+            stage,
+            f'=SUMIFS({data_col("SMV Unlock")},{data_col("Stage")},A{row_idx})',
+            f'=SUMIFS({data_col("OH Reduction")},{data_col("Stage")},A{row_idx})',
+            f'=SUMIFS({data_col("Other Savings")},{data_col("Stage")},A{row_idx})',
+            f'=COUNTIFS({data_col("Stage")},A{row_idx})',
+        ], style_data_cell), row_idx)
+        cached.set_row(ws_calc, row_idx, stage_values[row_idx - stage_start - 2][:4], first_col=2)
 
     stage_end_row = stage_start + 1 + len(stages)
 
     # --- Focus Area Summary ---
     focus_start = stage_end_row + 3
-    ws_calc.cell(row=focus_start, column=1, value='FOCUS AREA SUMMARY').font = Font(bold=True, size=12, color='118DFF')
+    section_title('FOCUS AREA SUMMARY', focus_start)
 
     focus_headers = ['Focus Area', 'SMV Unlock', 'OH Reduction', 'Other Savings', 'Solution Count']
-    for c, h in enumerate(focus_headers, 1):
-        style_header_cell(ws_calc.cell(row=focus_start+1, column=c, value=h))
-
-    for i, focus in enumerate(focus_areas):
-        row_idx = focus_start + 2 + i
-        ws_calc.cell(row=row_idx, column=1, value=focus)
-        ws_calc.cell(row=row_idx, column=2, value=f'=SUMIF(Data!$C$2:$C$100,A{row_idx},Data!$E$2:$E$100)')
-        ws_calc.cell(row=row_idx, column=3, value=f'=SUMIF(Data!$C$2:$C$100,A{row_idx},Data!$F$2:$F$100)')
-        ws_calc.cell(row=row_idx, column=4, value=f'=SUMIF(Data!$C$2:$C$100,A{row_idx},Data!$G$2:$G$100)')
-        ws_calc.cell(row=row_idx, column=5, value=f'=COUNTIF(Data!$C$2:$C$100,A{row_idx})')
-
-        for c in range(1, 6):
-            style_data_cell(ws_calc.cell(row=row_idx, column=c))
+    calc.append(sheet_writer.cells(ws_calc, focus_headers, style_header_cell), focus_start + 1)
+
+    for row_idx, focus in enumerate(focus_areas, focus_start + 2):
+        calc.append(sheet_writer.cells(ws_calc, [
+            focus,
+            f'=SUMIFS({data_col("SMV Unlock")},{data_col("Focus Area")},A{row_idx})',
+            f'=SUMIFS({data_col("OH Reduction")},{data_col("Focus Area")},A{row_idx})',
+            f'=SUMIFS({data_col("Other Savings")},{data_col("Focus Area")},A{row_idx})',
+            f'=COUNTIFS({data_col("Focus Area")},A{row_idx})',
+        ], style_data_cell), row_idx)
+        cached.set_row(ws_calc, row_idx, focus_values[row_idx - focus_start - 2][:4], first_col=2)
 
     focus_end_row = focus_start + 1 + len(focus_areas)
 
-    # Set column widths for calculations
-    calc_widths = [22, 14, 14, 14, 14, 14]
-    for c, w in enumerate(calc_widths, 1):
-        ws_calc.column_dimensions[get_column_letter(c)].width = w
-
     # ==================== DASHBOARD SHEET ====================
-    ws_dash = wb.create_sheet("Dashboard")
+    # Free-form layout: built in memory, then streamed into the write-only workbook
+    if stream:
+        ws_dash = sheet_writer.scratch_sheet("Dashboard")
+    else:
+        ws_dash = wb.create_sheet("Dashboard")
 
     # Background
-    bg_fill = PatternFill(start_color='F5F5F5', end_color='F5F5F5', fill_type='solid')
+    bg_fill = rs.solid_fill('F5F5F5')
     for row in range(1, 70):
         for col in range(1, 22):
             ws_dash.cell(row=row, column=col).fill = bg_fill
@@ -228,26 +261,36 @@ def main():
     # ========== KPI CARDS ==========
     # Card 1: Total Solutions
     create_kpi_card(ws_dash, 5, 2, "TOTAL SOLUTIONS",
-                   "=COUNTA(Data!B2:B100)", COLORS['primary'])
+                   f'=COUNTA({data_col("Solution Name")})', COLORS['primary'])
 
     # Card 2: SMV Unlock
     create_kpi_card(ws_dash, 5, 6, "TOTAL SMV UNLOCK",
-                   "=ROUND(SUM(Data!E2:E100),3)", COLORS['success'])
+                   f'=ROUND(SUM({data_col("SMV Unlock")}),3)', COLORS['success'])
 
     # Card 3: OH Reduction
     create_kpi_card(ws_dash, 5, 10, "OH REDUCTION",
-                   "=ROUND(SUM(Data!F2:F100),1)", COLORS['accent1'])
+                   f'=ROUND(SUM({data_col("OH Reduction")}),1)', COLORS['accent1'])
 
     # Card 4: Other Savings
     create_kpi_card(ws_dash, 5, 14, "OTHER SAVINGS",
-                   "=ROUND(SUM(Data!G2:G100),1)", COLORS['accent2'])
+                   f'=ROUND(SUM({data_col("Other Savings")}),1)', COLORS['accent2'])
 
     # Card 5: Avg Savings per Solution
     create_kpi_card(ws_dash, 5, 18, "AVG/SOLUTION",
-                   "=ROUND((SUM(Data!E2:E100)+SUM(Data!F2:F100)+SUM(Data!G2:G100))/COUNTA(Data!B2:B100),2)",
+                   f'=ROUND((SUM({data_col("SMV Unlock")})+SUM({data_col("OH Reduction")})+SUM({data_col("Other Savings")}))/COUNTA({data_col("Solution Name")}),2)',
                    COLORS['warning'])
 
+    solutions = int(df['Solution Name'].notna().sum())
+    _, smv_sum, oh_sum, other_sum = agg.grand().tolist()
+    cached.set(ws_dash, 7, 2, solutions)
+    cached.set(ws_dash, 7, 6, excel_round(smv_sum, 3))
+    cached.set(ws_dash, 7, 10, excel_round(oh_sum, 1))
+    cached.set(ws_dash, 7, 14, excel_round(other_sum, 1))
+    if solutions:
+        cached.set(ws_dash, 7, 18, excel_round((smv_sum + oh_sum + other_sum) / solutions, 2))
+
     # ========== SECTION 1: Division Performance ==========
+    profiling.begin('chart')
     ws_dash.merge_cells('B11:I11')
     sec1 = ws_dash['B11']
     sec1.value = "DIVISION PERFORMANCE"
@@ -361,6 +404,7 @@ def main():
     ws_dash.add_chart(chart4, "L30")
 
     # ========== SECTION 5: Top Performers Table ==========
+    profiling.begin('style')
     ws_dash.merge_cells('B47:J47')
     sec5 = ws_dash['B47']
     sec5.value = "TOP PERFORMERS RANKING"
@@ -381,6 +425,7 @@ def main():
     rank_colors = [('FFD700', '000000'), ('C0C0C0', '000000'), ('CD7F32', 'FFFFFF'),
                    ('FFFFFF', '666666'), ('FFFFFF', '666666')]
 
+    div_totals = [values[4] for values in div_values]
     for i in range(len(divisions)):
         r = 49 + i
         # Rank number
@@ -410,21 +455,24 @@ def main():
         ws_dash.cell(row=r, column=9,
                     value=f'=INDEX(Calculations!$E$3:$E${div_end_row},MATCH(C{r},Calculations!$A$3:$A${div_end_row},0))')
 
+        # MATCH(LARGE(...)) picks the first division with the i-th largest total
+        total = sorted(div_totals, reverse=True)[i]
+        smv, oh, other, count, _ = div_values[div_totals.index(total)]
+        cached.set_row(ws_dash, r, [divisions[div_totals.index(total)], None, excel_round(smv, 3),
+                                    excel_round(oh, 1), excel_round(other, 1), excel_round(total, 2), count],
+                       first_col=3)
+
         # Styling
         bg_color, txt_color = rank_colors[min(i, 4)]
-        fill = PatternFill(start_color=bg_color, end_color=bg_color, fill_type='solid')
+        fill = rs.solid_fill(bg_color)
+        font = rs.font(name='Segoe UI', size=10, bold=(i < 3), color=txt_color)
 
         for c in [2, 3, 5, 6, 7, 8, 9]:
             cell = ws_dash.cell(row=r, column=c)
             cell.fill = fill
-            cell.font = Font(name='Segoe UI', size=10, bold=(i < 3), color=txt_color)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = Border(
-                left=Side(style='thin', color='E0E0E0'),
-                right=Side(style='thin', color='E0E0E0'),
-                top=Side(style='thin', color='E0E0E0'),
-                bottom=Side(style='thin', color='E0E0E0')
-            )
+            cell.font = font
+            cell.alignment = rs.align()
+            cell.border = rs.box_border('E0E0E0')
         ws_dash.row_dimensions[r].height = 24
 
     # ========== SECTION 6: Key Insights Panel ==========
@@ -442,7 +490,15 @@ def main():
         ("TOTAL DIVISIONS", f'=COUNTA(Calculations!$A$3:$A${div_end_row})', '744EC2'),
     ]
 
-    white_fill = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
+    def first_max(column):
+        values = [row[column] for row in div_values]
+        return divisions[values.index(max(values))]
+
+    if divisions:
+        for i, value in enumerate([first_max(4), first_max(0), first_max(1), first_max(3), len(divisions)]):
+            cached.set(ws_dash, 48 + i, 15, value)
+
+    white_fill = rs.solid_fill('FFFFFF')
     for i, (label, formula, color) in enumerate(insights_data):
         r = 48 + i
 
@@ -481,11 +537,33 @@ def main():
     # Hide gridlines
     ws_dash.sheet_view.showGridLines = False
 
+    if stream:
+        ws_layout, ws_dash = ws_dash, wb.create_sheet("Dashboard")
+        sheet_writer.copy_sheet(ws_layout, ws_dash)
+
     # Move Dashboard to front
-    wb.move_sheet(ws_dash, offset=-2)
+    wb.move_sheet(ws_dash.title, offset=-2)
 
     # Save
-    wb.save('Solution_Dashboard_Dynamic.xlsx')
+    profiling.begin('save')
+    if precompute:
+        cached.save(wb, output)
+    else:
+        wb.save(output)
+    profiling.end()
+
+    return {
+        'divisions': len(divisions),
+        'stages': len(stages),
+        'focus_areas': len(focus_areas),
+        'solutions': len(df),
+    }
+
+def main(stream=False, precompute=False):
+    # Load existing data
+    profiling.begin('read')
+    dataset = data_store.get_store('Solution List.xlsx').get()
+    stats = build_dynamic_dashboard(dataset, 'Solution_Dashboard_Dynamic.xlsx', stream, precompute)
 
     print("=" * 60)
     print("DYNAMIC DASHBOARD CREATED SUCCESSFULLY!")
@@ -502,10 +580,18 @@ def main():
     print("  1. Dashboard - Main visualization")
     print("  2. Data - Your source data (edit here!)")
     print("  3. Calculations - Dynamic pivot tables")
-    print(f"\nDivisions tracked: {len(divisions)}")
-    print(f"Stages tracked: {len(stages)}")
-    print(f"Focus Areas tracked: {len(focus_areas)}")
-    print(f"Total Solutions: {len(df)}")
+    print(f"\nDivisions tracked: {stats['divisions']}")
+    print(f"Stages tracked: {stats['stages']}")
+    print(f"Focus Areas tracked: {stats['focus_areas']}")
+    print(f"Total Solutions: {stats['solutions']}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build Solution_Dashboard_Dynamic.xlsx from Solution List.xlsx")
+    parser.add_argument('--stream', action='store_true',
+                        help="write-only workbook: stream rows to disk so memory stays flat for large sheets")
+    parser.add_argument('--precompute', action='store_true',
+                        help="store every aggregate, rank and insight as a cached value next to its formula")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    with profiling.from_args(args):
+        main(stream=args.stream, precompute=args.precompute)
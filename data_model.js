@@ -0,0 +1,351 @@
+// Dashboard Data Model
+// ================================
+// Parsing, normalization, filtering and aggregation. Runs inside data_worker.js
+// so the page only renders; dashboard.html also loads it for browsers without
+// workers. No DOM access in here.
+
+// Column Keys
+const KEYS = {
+  division: "Division",
+  name: "Solution Name",
+  focus: "Focus Area",
+  stage: "Stage",
+  smv: "SMV Unlock",
+  oh: "OH Reduction",
+  other: "Other Savings"
+};
+
+// Category columns held as dictionary codes
+const CATEGORIES = ['division', 'stage', 'focus'];
+
+// Solution Name search index: n-gram length
+const GRAM = 3;
+
+function normalize(value) {
+  if (value === undefined || value === null) return "Unspecified";
+  return String(value).trim() || "Unspecified";
+}
+
+function toNumber(value) {
+  if (value === undefined || value === null) return 0;
+  const num = parseFloat(String(value).replace(/[^0-9.-]/g, ""));
+  return isNaN(num) ? 0 : num;
+}
+
+// First sheet of a workbook as row objects with trimmed header keys
+function workbookRows(buffer) {
+  const workbook = XLSX.read(buffer, { type: "array" });
+  const sheet = workbook.Sheets[workbook.SheetNames[0]];
+  const rawRows = XLSX.utils.sheet_to_json(sheet, { defval: "" });
+
+  return rawRows.map(row => {
+    const normalized = {};
+    Object.keys(row).forEach(key => normalized[key.trim()] = row[key]);
+    return normalized;
+  });
+}
+
+// Columnar Data Model
+// ================================
+// Savings are Float64Arrays and Division/Stage/Focus Area are Uint16Array codes
+// into sorted per-column dictionaries. Strings are normalized and numbers parsed
+// once here; filters and aggregates are numeric loops over row indices.
+function buildTable(rows) {
+  const n = rows.length;
+  const t = {
+    length: n,
+    names: new Array(n),
+    smv: new Float64Array(n),
+    oh: new Float64Array(n),
+    other: new Float64Array(n),
+    codes: {},
+    dicts: {},
+    lookup: {}
+  };
+
+  t.lowerNames = new Array(n);
+  for (let i = 0; i < n; i++) {
+    const row = rows[i];
+    t.names[i] = normalize(row[KEYS.name]);
+    t.lowerNames[i] = t.names[i].toLowerCase();
+    t.smv[i] = toNumber(row[KEYS.smv]);
+    t.oh[i] = toNumber(row[KEYS.oh]);
+    t.other[i] = toNumber(row[KEYS.other]);
+  }
+
+  CATEGORIES.forEach(col => {
+    const labels = rows.map(row => normalize(row[KEYS[col]]));
+    const dict = [...new Set(labels)].sort();
+    const lookup = new Map(dict.map((label, code) => [label, code]));
+    const codes = new Uint16Array(n);
+    for (let i = 0; i < n; i++) codes[i] = lookup.get(labels[i]);
+    t.codes[col] = codes;
+    t.dicts[col] = dict;
+    t.lookup[col] = lookup;
+  });
+  return t;
+}
+
+// The columns the page needs to render rows; copies when the originals stay behind
+function tableView(t, copy) {
+  const clone = a => copy ? a.slice() : a;
+  const codes = {};
+  CATEGORIES.forEach(col => codes[col] = clone(t.codes[col]));
+  return {
+    length: t.length,
+    names: t.names,
+    smv: clone(t.smv),
+    oh: clone(t.oh),
+    other: clone(t.other),
+    codes,
+    dicts: t.dicts
+  };
+}
+
+// Code of a label in a category column: -1 for no filter, -2 for a label not in the data
+function codeOf(t, col, label) {
+  if (!label) return -1;
+  const code = t.lookup[col].get(label);
+  return code === undefined ? -2 : code;
+}
+
+// Per-code count and savings of the rows in idx, as typed arrays indexed by code
+function aggregate(t, idx, col) {
+  const size = t.dicts[col].length;
+  const agg = { count: new Float64Array(size), smv: new Float64Array(size), oh: new Float64Array(size), other: new Float64Array(size) };
+  const codes = t.codes[col];
+  const { smv, oh, other } = t;
+  for (let j = 0; j < idx.length; j++) {
+    const i = idx[j];
+    const c = codes[i];
+    agg.count[c]++;
+    agg.smv[c] += smv[i];
+    agg.oh[c] += oh[i];
+    agg.other[c] += other[i];
+  }
+  return agg;
+}
+
+// Stage x Focus Area sums, indexed by stageCode * focusCount + focusCode
+function aggregateCells(t, idx) {
+  const nf = t.dicts.focus.length;
+  const size = t.dicts.stage.length * nf;
+  const agg = { count: new Float64Array(size), smv: new Float64Array(size), oh: new Float64Array(size), other: new Float64Array(size) };
+  const sc = t.codes.stage, fc = t.codes.focus;
+  const { smv, oh, other } = t;
+  for (let j = 0; j < idx.length; j++) {
+    const i = idx[j];
+    const c = sc[i] * nf + fc[i];
+    agg.count[c]++;
+    agg.smv[c] += smv[i];
+    agg.oh[c] += oh[i];
+    agg.other[c] += other[i];
+  }
+  return agg;
+}
+
+function sumSavings(t, idx) {
+  const { smv, oh, other } = t;
+  let s = 0, o = 0, x = 0;
+  for (let j = 0; j < idx.length; j++) {
+    const i = idx[j];
+    s += smv[i]; o += oh[i]; x += other[i];
+  }
+  return { count: idx.length, smv: s, oh: o, other: x };
+}
+
+// Totals plus per-Division/Stage/Focus Area aggregates (and the matrix cells) of idx
+function summarize(t, idx, withCells) {
+  const summary = sumSavings(t, idx);
+  CATEGORIES.forEach(col => summary[col] = aggregate(t, idx, col));
+  if (withCells) summary.cells = aggregateCells(t, idx);
+  return summary;
+}
+
+// Bitmap Filter Index
+// ================================
+// One bitset (32 rows per word) per Division/Stage/Focus Area value, and posting
+// lists of row indices per lowercase name trigram. Built once per data change;
+// a filter change is then a few word-wise ANDs plus a walk over the result.
+function buildIndex(t) {
+  const words = (t.length + 31) >>> 5;
+  const all = new Uint32Array(words).fill(0xFFFFFFFF);
+  if (t.length & 31) all[words - 1] = (1 << (t.length & 31)) - 1;
+
+  const bits = {};
+  CATEGORIES.forEach(col => {
+    const sets = t.dicts[col].map(() => new Uint32Array(words));
+    const codes = t.codes[col];
+    for (let i = 0; i < t.length; i++) sets[codes[i]][i >>> 5] |= 1 << (i & 31);
+    bits[col] = sets;
+  });
+
+  const postings = new Map();
+  for (let i = 0; i < t.length; i++) {
+    const name = t.lowerNames[i];
+    for (let k = 0; k + GRAM <= name.length; k++) {
+      const gram = name.substr(k, GRAM);
+      let list = postings.get(gram);
+      if (!list) postings.set(gram, list = []);
+      if (list[list.length - 1] !== i) list.push(i);
+    }
+  }
+  const grams = new Map();
+  postings.forEach((list, gram) => grams.set(gram, Uint32Array.from(list)));
+
+  return { words, all, bits, grams };
+}
+
+function andBits(a, b) {
+  const out = new Uint32Array(a.length);
+  for (let w = 0; w < a.length; w++) out[w] = a[w] & b[w];
+  return out;
+}
+
+// Row indices of the set bits, ascending
+function bitsToIndices(bits) {
+  let count = 0;
+  for (let w = 0; w < bits.length; w++) {
+    let v = bits[w];
+    while (v) { v &= v - 1; count++; }
+  }
+  const idx = new Uint32Array(count);
+  let k = 0;
+  for (let w = 0; w < bits.length; w++) {
+    let v = bits[w];
+    while (v) {
+      const low = v & -v;
+      idx[k++] = (w << 5) + 31 - Math.clz32(low);
+      v ^= low;
+    }
+  }
+  return idx;
+}
+
+// base narrowed to the rows with the given category labels ({ division: label, ... }, '' = any)
+function matchBits(t, index, base, wanted) {
+  let bits = base;
+  CATEGORIES.forEach(col => {
+    const code = codeOf(t, col, wanted[col]);
+    if (code === -1) return;
+    bits = code === -2 ? new Uint32Array(base.length) : andBits(bits, index.bits[col][code]);
+  });
+  return bits;
+}
+
+// base narrowed to the rows whose lowercase name contains query
+function searchBits(t, index, base, query) {
+  const out = new Uint32Array(base.length);
+  const names = t.lowerNames;
+  const test = i => {
+    if ((base[i >>> 5] & (1 << (i & 31))) && names[i].includes(query)) out[i >>> 5] |= 1 << (i & 31);
+  };
+  if (query.length < GRAM) {
+    bitsToIndices(base).forEach(test);
+    return out;
+  }
+  // Candidates from the rarest trigram of the query, confirmed against the full name
+  let rarest = null;
+  for (let k = 0; k + GRAM <= query.length; k++) {
+    const list = index.grams.get(query.substr(k, GRAM));
+    if (!list) return out;
+    if (!rarest || list.length < rarest.length) rarest = list;
+  }
+  rarest.forEach(test);
+  return out;
+}
+
+// Data Set
+// ================================
+// Row objects (for /rows delta patching), their columns and index, and the
+// answers to filter queries.
+class DataSet {
+  constructor() {
+    this.rows = [];
+    this.version = null;
+    this.setRows([]);
+  }
+
+  setRows(rows) {
+    this.rows = rows;
+    this.table = buildTable(rows);
+    this.index = buildIndex(this.table);
+  }
+
+  // Incremental sync: the server sends only rows added, changed or removed since our version
+  async sync(since) {
+    const url = since ? `/rows?since=${encodeURIComponent(since)}` : '/rows';
+    const response = await fetch(url, { cache: "no-store", redirect: "error" });
+    if (!response.ok || !(response.headers.get('Content-Type') || '').includes('json')) {
+      throw new Error("Row sync unavailable");
+    }
+    return this.applyRowDelta(await response.json());
+  }
+
+  // 'full', 'patched' or null when nothing changed
+  applyRowDelta(delta) {
+    this.version = delta.version;
+    if (delta.full) {
+      this.setRows(delta.rows);
+      return 'full';
+    }
+    if (!delta.added.length && !delta.changed.length && !delta.removed.length && !delta.order) return null;
+
+    const removed = new Set(delta.removed);
+    const changed = new Map(delta.changed.map(row => [row._key, row]));
+    let rows = this.rows.filter(row => !removed.has(row._key)).map(row => changed.get(row._key) || row).concat(delta.added);
+    // Sent when rows moved or were inserted mid-sheet, so the rows keep the sheet's order
+    if (delta.order) {
+      const byKey = new Map(rows.map(row => [row._key, row]));
+      rows = delta.order.map(key => byKey.get(key));
+    }
+    this.setRows(rows);
+    return 'patched';
+  }
+
+  // Rows and aggregates for the filter bar ({ division, stage, focus, search }) and drill-through selection
+  query(filters, drill) {
+    const { table, index } = this;
+    let bits = matchBits(table, index, index.all, filters);
+    if (filters.search) bits = searchBits(table, index, bits, filters.search);
+    const filteredIdx = bitsToIndices(bits);
+
+    let drillIdx = drill ? bitsToIndices(matchBits(table, index, bits, drill)) : filteredIdx;
+    if (drillIdx.length === 0) drillIdx = filteredIdx;
+
+    return {
+      filteredIdx,
+      drillIdx,
+      filtered: summarize(table, filteredIdx, true),
+      drill: drillIdx === filteredIdx ? null : summarize(table, drillIdx, false)
+    };
+  }
+}
+
+// Request handler shared by the worker and the in-page fallback:
+// resolves to { reply, transfer } where transfer lists the ArrayBuffers to move
+async function handleDataRequest(data, { type, since, buffer, filters, drill }, inWorker) {
+  let change = null;
+  if (type === 'sync') {
+    change = await data.sync(since);
+  } else if (type === 'parse') {
+    data.setRows(workbookRows(buffer));
+    data.version = null;
+    change = 'full';
+  }
+  if (change === 'full') drill = null;
+
+  const reply = { version: data.version, change, view: data.query(filters, drill) };
+  if (change) reply.table = tableView(data.table, inWorker);
+  return { reply, transfer: inWorker ? transferables(reply) : [] };
+}
+
+// Distinct ArrayBuffers under a reply, for postMessage's transfer list
+function transferables(value, found = new Set()) {
+  if (ArrayBuffer.isView(value)) {
+    found.add(value.buffer);
+  } else if (value && typeof value === 'object' && !Array.isArray(value)) {
+    Object.values(value).forEach(v => transferables(v, found));
+  }
+  return [...found];
+}
@@ -0,0 +1,446 @@
+import hashlib
+import io
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import zipfile
+
+import numpy as np
+from openpyxl import load_workbook
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Dimensions the dashboard groups and filters by
+CATEGORY_COLUMNS = ('Division', 'Focus Area', 'Stage')
+
+# Savings columns stored as float64 arrays (NaN for blank cells); every other
+# column is dictionary-encoded as (distinct values, uint32 codes)
+NUMERIC_COLUMNS = ('SMV Unlock', 'OH Reduction', 'Other Savings')
+
+# Columnar snapshot written next to the workbook (uncompressed .npz)
+SNAPSHOT_SUFFIX = '.npz'
+SNAPSHOT_FORMAT = 1
+
+# Columns an uploaded workbook must have (same as KEYS in app.js)
+REQUIRED_COLUMNS = ('Division', 'Solution Name', 'Focus Area', 'Stage', 'SMV Unlock', 'OH Reduction', 'Other Savings')
+
+# Bytes copied per read while streaming an upload to disk
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadError(ValueError):
+    """An uploaded workbook was rejected before replacing the live file"""
+
+
+def normalize(value):
+    """Trim a cell value, mapping blanks to 'Unspecified'"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 'Unspecified'
+    return str(value).strip() or 'Unspecified'
+
+
+def to_number(value):
+    """Parse a cell value as a float, ignoring stray characters (NaN when blank)"""
+    if value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = ''.join(ch for ch in str(value) if ch in '0123456789.-')
+    try:
+        return float(cleaned)
+    except ValueError:
+        return math.nan
+
+
+class Dataset:
+    """Immutable, columnar view of one version of the workbook"""
+
+    def __init__(self, key, content, header, columns, length, version=0):
+        self.key = key              # (mtime_ns, size, sha256)
+        self.version = version      # data version bumped on every upload
+        self.content = content      # raw .xlsx bytes
+        self.header = header        # stripped column names in sheet order
+        self.columns = columns      # name -> float64 ndarray | (values, uint32 codes)
+        self.length = length
+        self._derived = {}
+
+    @property
+    def sha256(self):
+        return self.key[2]
+
+    @property
+    def mtime(self):
+        return self.key[0] / 1e9
+
+    def column(self, name):
+        """Decoded values of a column, in row order"""
+        col = self.columns[name]
+        if name in NUMERIC_COLUMNS:
+            return col.tolist()
+        values, codes = col
+        return [values[c] for c in codes.tolist()]
+
+    def labels(self, name):
+        """Normalized category labels and a per-row code into them (computed once)"""
+        key = ('labels', name)
+        if key not in self._derived:
+            values, codes = self.columns[name]
+            labels = sorted({normalize(v) for v in values})
+            index = {label: i for i, label in enumerate(labels)}
+            remap = np.array([index[normalize(v)] for v in values], dtype=np.uint32)
+            self._derived[key] = (labels, remap[codes] if len(remap) else codes)
+        return self._derived[key]
+
+    def savings(self, name):
+        """Savings column with blanks counted as 0 (computed once)"""
+        key = ('savings', name)
+        if key not in self._derived:
+            self._derived[key] = np.nan_to_num(self.columns[name], nan=0.0)
+        return self._derived[key]
+
+    def names(self):
+        """Normalized Solution Name per row (computed once)"""
+        key = ('names', None)
+        if key not in self._derived:
+            if 'Solution Name' in self.columns:
+                values, codes = self.columns['Solution Name']
+                normalized = [normalize(v) for v in values]
+                self._derived[key] = [normalized[c] for c in codes.tolist()]
+            else:
+                self._derived[key] = ['Unspecified'] * self.length
+        return self._derived[key]
+
+    def take(self, rows):
+        """Dataset of the given rows only, with dictionaries trimmed to the values they use; small to pickle"""
+        rows = np.asarray(rows, dtype=np.intp)
+        columns = {}
+        for name, col in self.columns.items():
+            if name in NUMERIC_COLUMNS:
+                columns[name] = col[rows]
+            else:
+                values, codes = col
+                used, remap = np.unique(codes[rows], return_inverse=True)
+                columns[name] = ([values[c] for c in used.tolist()], remap.astype(np.uint32))
+        return Dataset(self.key, b'', self.header, columns, len(rows), self.version)
+
+    def to_dataframe(self):
+        """The sheet as a pandas DataFrame, equivalent to pd.read_excel with stripped columns"""
+        import pandas as pd
+        data = {}
+        for name in self.header:
+            col = self.columns[name]
+            if name in NUMERIC_COLUMNS:
+                data[name] = col
+            else:
+                values, codes = col
+                data[name] = np.array(values, dtype=object)[codes]
+        return pd.DataFrame(data, columns=self.header)
+
+
+def parse_workbook(content, key, version=0):
+    """Parse .xlsx bytes into a columnar Dataset"""
+    wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        first = next(rows, None) or ()
+        header = [str(h).strip() if h is not None else '' for h in first]
+        positions = [(i, name) for i, name in enumerate(header) if name]
+
+        raw = {name: [] for _, name in positions}
+        dictionaries = {name: {} for _, name in positions if name not in NUMERIC_COLUMNS}
+
+        length = 0
+        for values in rows:
+            if values is None or all(v is None for v in values):
+                continue
+            length += 1
+            for i, name in positions:
+                value = values[i] if i < len(values) else None
+                if name in NUMERIC_COLUMNS:
+                    raw[name].append(to_number(value))
+                else:
+                    lookup = dictionaries[name]
+                    code = lookup.get(value)
+                    if code is None:
+                        code = lookup[value] = len(lookup)
+                    raw[name].append(code)
+    finally:
+        wb.close()
+
+    columns = {}
+    for name, values in raw.items():
+        if name in NUMERIC_COLUMNS:
+            columns[name] = np.array(values, dtype=np.float64)
+        else:
+            columns[name] = (list(dictionaries[name]), np.array(values, dtype=np.uint32))
+    return Dataset(key, content, [name for _, name in positions], columns, length, version)
+
+
+# ========== COLUMNAR SNAPSHOT ==========
+def snapshot_path(path):
+    return path + SNAPSHOT_SUFFIX
+
+
+def save_snapshot(dataset, path):
+    """Write the Dataset's columns next to the workbook; returns False if a column can't be stored"""
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'sha256': dataset.sha256,
+        'header': dataset.header,
+        'length': dataset.length,
+        'dictionaries': {},
+    }
+    arrays = {}
+    for i, name in enumerate(dataset.header):
+        col = dataset.columns[name]
+        if name in NUMERIC_COLUMNS:
+            arrays[f'c{i}'] = col
+        else:
+            meta['dictionaries'][name] = col[0]
+            arrays[f'c{i}'] = col[1]
+    try:
+        arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+    except (TypeError, ValueError):
+        return False    # e.g. date cells; readers fall back to the xlsx
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    _write_atomic(snapshot_path(path), buffer.getvalue())
+    return True
+
+
+def load_snapshot(path, content, key, version=0):
+    """Dataset from the snapshot if it was taken from exactly this workbook content, else None"""
+    try:
+        with np.load(snapshot_path(path), allow_pickle=False) as npz:
+            meta = json.loads(npz['meta'].tobytes().decode('utf-8'))
+            if meta.get('format') != SNAPSHOT_FORMAT or meta.get('sha256') != key[2]:
+                return None
+            columns = {}
+            for i, name in enumerate(meta['header']):
+                array_ = npz[f'c{i}']
+                columns[name] = array_ if name in NUMERIC_COLUMNS else (meta['dictionaries'][name], array_)
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        return None     # missing, truncated or foreign: readers fall back to the xlsx
+    return Dataset(key, content, meta['header'], columns, meta['length'], version)
+
+
+# ========== VERSIONED, ATOMIC REPLACEMENT ==========
+def version_path(path):
+    return path + '.version'
+
+
+def read_version(path):
+    """Current data version of a workbook (0 before the first upload)"""
+    try:
+        with open(version_path(path), 'r', encoding='ascii') as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _fsync_dir(directory):
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _copy_mode(src, tmp):
+    # mkstemp creates 0600 files; keep the live file's permissions across the swap
+    try:
+        mode = os.stat(src).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    os.chmod(tmp, mode)
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        _copy_mode(path, tmp)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def validate_workbook(path):
+    """Check that a workbook opens and its header row has every REQUIRED_COLUMNS entry"""
+    try:
+        wb = load_workbook(path, read_only=True, data_only=True)
+    except Exception:
+        raise UploadError('Invalid file. Please upload a valid Excel workbook (.xlsx)')
+    try:
+        if not wb.worksheets:   # opens, but lists no worksheets
+            raise UploadError('Invalid file. Please upload a valid Excel workbook (.xlsx)')
+        first = next(wb.worksheets[0].iter_rows(max_row=1, values_only=True), None) or ()
+    finally:
+        wb.close()
+    header = {str(h).strip() for h in first if h is not None}
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise UploadError(f"Missing required columns: {', '.join(missing)}")
+
+
+class _FileLock:
+    """Inter-process lock serializing uploads across gunicorn workers"""
+
+    _local = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path + '.lock'
+
+    def __enter__(self):
+        self._local.acquire()
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._local.release()
+
+
+def replace_workbook(path, stream, chunk_size=UPLOAD_CHUNK_BYTES):
+    """Stream an upload to a temp file, validate it, then atomically swap it in; returns the new data version"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.upload-', suffix='.xlsx')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+        validate_workbook(tmp)
+        _copy_mode(path, tmp)
+
+        # Parse once here so readers load the columnar snapshot instead of the xlsx
+        with open(tmp, 'rb') as f:
+            content = f.read()
+        dataset = parse_workbook(content, (0, len(content), hashlib.sha256(content).hexdigest()))
+
+        with _FileLock(path):
+            save_snapshot(dataset, path)
+            os.replace(tmp, path)
+            version = read_version(path) + 1
+            _write_atomic(version_path(path), str(version).encode('ascii'))
+            _fsync_dir(directory)
+        return version
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+class WorkbookStore:
+    """Process-wide cache of the parsed workbook, keyed on mtime, size and content hash"""
+
+    def __init__(self, path):
+        self.path = path
+        self._entry = (None, None)    # (stamp, Dataset), swapped as one reference
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'loads': 0, 'snapshot_loads': 0,
+                      'load_seconds': 0.0, 'last_load_seconds': 0.0}
+
+    def _stamp(self):
+        st = os.stat(self.path)
+        try:
+            version_mtime = os.stat(version_path(self.path)).st_mtime_ns
+        except FileNotFoundError:
+            version_mtime = 0
+        return st.st_mtime_ns, st.st_size, version_mtime
+
+    def get(self):
+        """Return the current Dataset, parsing the workbook only if its content changed"""
+        stamp = self._stamp()
+        cached_stamp, dataset = self._entry
+        if dataset is not None and cached_stamp == stamp:
+            self.stats['hits'] += 1
+            return dataset
+
+        with self._lock:
+            stamp = self._stamp()
+            cached_stamp, dataset = self._entry
+            if dataset is not None and cached_stamp == stamp:
+                self.stats['hits'] += 1
+                return dataset
+
+            self.stats['misses'] += 1
+            version = read_version(self.path)
+            with open(self.path, 'rb') as f:
+                content = f.read()
+            key = (stamp[0], stamp[1], hashlib.sha256(content).hexdigest())
+
+            if dataset is not None and dataset.sha256 == key[2]:
+                # Touched but unchanged: keep the parsed columns
+                dataset = Dataset(key, content, dataset.header, dataset.columns, dataset.length, version)
+            else:
+                started = time.perf_counter()
+                dataset = load_snapshot(self.path, content, key, version)
+                if dataset is not None:
+                    self.stats['snapshot_loads'] += 1
+                else:
+                    # Snapshot missing or stale: parse the xlsx and refresh it
+                    dataset = parse_workbook(content, key, version)
+                    self.stats['loads'] += 1
+                    try:
+                        save_snapshot(dataset, self.path)
+                    except OSError:
+                        pass
+                elapsed = time.perf_counter() - started
+                self.stats['load_seconds'] += elapsed
+                self.stats['last_load_seconds'] = elapsed
+
+            self._entry = (stamp, dataset)
+            return dataset
+
+    def invalidate(self):
+        """Drop the cached Dataset so the next get() re-reads the file"""
+        with self._lock:
+            self._entry = (None, None)
+
+    def replace(self, stream):
+        """Validate and atomically install an uploaded workbook; readers keep the old Dataset until the swap"""
+        return replace_workbook(self.path, stream)
+
+    def snapshot_stats(self):
+        dataset = self._entry[1]
+        stats = dict(self.stats)
+        stats['sha256'] = dataset.sha256 if dataset is not None else None
+        stats['version'] = dataset.version if dataset is not None else read_version(self.path)
+        return stats
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path):
+    """Shared WorkbookStore for a workbook path"""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = WorkbookStore(path)
+        return _stores[path]
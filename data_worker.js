@@ -0,0 +1,24 @@
+// Dashboard Data Worker
+// ================================
+// Parses workbooks, syncs /rows and answers filter queries for app.js, off the
+// UI thread. The page sends the (hashed) URLs of xlsx.full.min.js and
+// data_model.js first; requests are then handled one at a time, in order.
+
+let data = null;
+let queue = Promise.resolve();
+
+self.onmessage = e => {
+  const msg = e.data;
+  if (msg.type === 'init') {
+    importScripts(...msg.scripts);
+    data = new DataSet();
+    return;
+  }
+
+  queue = queue
+    .then(() => handleDataRequest(data, msg, true))
+    .then(
+      ({ reply, transfer }) => self.postMessage({ id: msg.id, reply }, transfer),
+      error => self.postMessage({ id: msg.id, error: error.message })
+    );
+};
@@ -0,0 +1,16 @@
+# Gunicorn settings (picked up automatically from the working directory)
+# gevent workers keep many idle /events streams open without a thread each
+worker_class = 'gevent'
+worker_connections = 1000
+timeout = 60
+
+
+def on_starting(server):
+    # One shared directory per server for the workers' /metrics snapshots
+    import request_metrics
+    request_metrics.prepare_dir()
+
+
+def on_exit(server):
+    import request_metrics
+    request_metrics.remove_dir()
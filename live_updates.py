@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+
+# Seconds between stat() checks of the watched file (one watcher per process)
+POLL_INTERVAL = 1.0
+
+# Seconds between SSE keep-alive comments on idle streams
+KEEPALIVE_INTERVAL = 25.0
+
+
+# One watcher per process stats the file, so uploads handled by another gunicorn
+# worker are seen too. Under the gevent worker the thread and waits are greenlets.
+class ChangeNotifier:
+    """Wakes waiting event streams when a file changes on disk"""
+
+    def __init__(self, path, interval=POLL_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._version = self._stat_version()
+        self._watcher = None
+
+    def _stat_version(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return ''
+        return f'{st.st_mtime_ns:x}-{st.st_size:x}'
+
+    def _ensure_watcher(self):
+        if self._watcher is None or not self._watcher.is_alive():
+            self._watcher = threading.Thread(target=self._watch, name='change-notifier', daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            self.notify()
+
+    @property
+    def version(self):
+        return self._version
+
+    def notify(self):
+        """Re-check the file and wake every waiting stream if it changed"""
+        version = self._stat_version()
+        if version != self._version:
+            with self._cond:
+                self._version = version
+                self._cond.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until the version differs from the given one; returns the new version or None on timeout"""
+        self._ensure_watcher()
+        with self._cond:
+            if self._cond.wait_for(lambda: self._version != version, timeout):
+                return self._version
+        return None
+
+    def stream(self):
+        """Server-Sent Events: a 'version' event on connect and on every change, keep-alives in between"""
+        version = self._version
+        yield f'retry: 5000\nevent: version\ndata: {version}\n\n'
+        while True:
+            new_version = self.wait(version, KEEPALIVE_INTERVAL)
+            if new_version is None:
+                yield ': keep-alive\n\n'
+            else:
+                version = new_version
+                yield f'event: version\ndata: {version}\n\n'
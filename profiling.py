@@ -0,0 +1,160 @@
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# The report builders mark phases with begin('read'), begin('style'), ...; each
+# mark closes the previous phase. Marks cost nothing unless a recorder is active.
+_active = None
+
+# Environment fallbacks for the --profile* command line options
+PROFILE_ENV = 'SOLUTION_PROFILE'
+JSON_ENV = 'SOLUTION_PROFILE_JSON'
+PSTATS_ENV = 'SOLUTION_PROFILE_PSTATS'
+
+MB = 1024 * 1024
+
+
+class PhaseRecorder:
+    """Wall time, CPU time and (with memory=True) tracemalloc peak per named phase
+
+    Times are summed over every begin() of the same name; the memory peak is the
+    highest traced allocation seen while the phase was running.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.phases = {}    # name -> {'wall', 'cpu'[, 'peak_mb']}, in first-seen order
+        self._current = None
+        self._start = (0.0, 0.0)
+        self._began = self._stopped = None
+
+    def start(self):
+        self._began = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        self.end()
+        self._stopped = (time.perf_counter(), time.process_time())
+
+    def begin(self, name):
+        self.end()
+        self._current = name
+        if self.memory:
+            tracemalloc.reset_peak()
+        self._start = (time.perf_counter(), time.process_time())
+
+    def end(self):
+        if self._current is None:
+            return
+        wall, cpu = time.perf_counter() - self._start[0], time.process_time() - self._start[1]
+        phase = self.phases.setdefault(self._current, {'wall': 0.0, 'cpu': 0.0})
+        phase['wall'] += wall
+        phase['cpu'] += cpu
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1] / MB
+            phase['peak_mb'] = max(phase.get('peak_mb', 0.0), peak)
+        self._current = None
+
+    def total(self):
+        """Wall and CPU time from start() to stop() (or now), and the highest phase peak"""
+        wall, cpu = self._stopped or (time.perf_counter(), time.process_time())
+        total = {'wall': wall - self._began[0], 'cpu': cpu - self._began[1]}
+        if self.memory and self.phases:
+            total['peak_mb'] = max(phase['peak_mb'] for phase in self.phases.values())
+        return total
+
+    def as_dict(self):
+        return {name: dict(phase) for name, phase in self.phases.items()}
+
+    def report(self):
+        """JSON-ready {'phases': {...}, 'total': {...}}"""
+        return {'phases': self.as_dict(), 'total': self.total()}
+
+    def table(self):
+        """Summary table, one line per phase plus the total"""
+        columns = ['wall s', 'cpu s'] + (['peak MB'] if self.memory else [])
+        lines = [f"{'phase':<12}" + ''.join(f'{c:>10}' for c in columns) + f"{'wall %':>9}"]
+        total = self.total()
+        rows = list(self.phases.items()) + [('total', total)]
+        for name, phase in rows:
+            values = [phase['wall'], phase['cpu']] + ([phase.get('peak_mb', 0.0)] if self.memory else [])
+            share = 100 * phase['wall'] / total['wall'] if total['wall'] else 0.0
+            lines.append(f'{name:<12}' + ''.join(f'{v:>10.3f}' for v in values[:2])
+                         + ''.join(f'{v:>10.1f}' for v in values[2:]) + f'{share:>8.1f}%')
+        return '\n'.join(lines)
+
+
+def begin(name):
+    """Start a named phase (ending the current one) if phases are being recorded"""
+    if _active is not None:
+        _active.begin(name)
+
+
+def end():
+    """End the current phase"""
+    if _active is not None:
+        _active.end()
+
+
+@contextmanager
+def recording(memory=False):
+    """Record the phases of the code run inside; yields the PhaseRecorder
+
+    memory=True also traces allocations with tracemalloc, which slows the run down.
+    """
+    global _active
+    previous, _active = _active, PhaseRecorder(memory)
+    recorder = _active
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    recorder.start()
+    try:
+        yield recorder
+    finally:
+        recorder.stop()
+        if started_tracing:
+            tracemalloc.stop()
+        _active = previous
+
+
+def add_arguments(parser):
+    """--profile, --profile-json and --profile-pstats, defaulting to the SOLUTION_PROFILE* env vars"""
+    parser.add_argument('--profile', action='store_true', default=bool(os.environ.get(PROFILE_ENV)),
+                        help=f"print wall time, CPU time and memory peak per phase (env: {PROFILE_ENV}=1)")
+    parser.add_argument('--profile-json', metavar='PATH', default=os.environ.get(JSON_ENV),
+                        help=f"also write the phase report as JSON ('-' for stdout; env: {JSON_ENV})")
+    parser.add_argument('--profile-pstats', metavar='PATH', default=os.environ.get(PSTATS_ENV),
+                        help=f"also run cProfile and dump its stats for pstats/snakeviz (env: {PSTATS_ENV})")
+
+
+@contextmanager
+def from_args(args):
+    """Profile the code run inside as requested by add_arguments() options; a no-op when none are set"""
+    if not (args.profile or args.profile_json or args.profile_pstats):
+        yield None
+        return
+
+    profiler = cProfile.Profile() if args.profile_pstats else None
+    with recording(memory=True) as recorder:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield recorder
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+    print('\n' + recorder.table(), file=sys.stderr)
+    if profiler is not None:
+        profiler.dump_stats(args.profile_pstats)
+        print(f"cProfile stats written to {args.profile_pstats}", file=sys.stderr)
+    if args.profile_json == '-':
+        print(json.dumps(recorder.report()))
+    elif args.profile_json:
+        with open(args.profile_json, 'w') as f:
+            json.dump(recorder.report(), f, indent=2)
+        print(f"Phase report written to {args.profile_json}", file=sys.stderr)
@@ -0,0 +1,202 @@
+"""Report workbooks built on demand for the current data version and cached on disk
+
+    python report_cache.py dashboard "Solution List.xlsx" out.xlsx --stream
+
+Builds run in a child process (the command line above), so a gevent worker keeps
+serving requests while openpyxl works. One build per (report, data version,
+options) at a time: requests in the same process wait on it, and other gunicorn
+workers wait on a lock file next to the output, then find the finished file.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Overrides the cache directory (default: report_cache/ next to the source workbook)
+CACHE_DIR_ENV = 'REPORT_CACHE_DIR'
+
+# name -> (module, builder, download name, options with their served defaults)
+REPORTS = {
+    'dashboard': ('create_dashboard', 'build_dashboard', 'Solution_Dashboard.xlsx',
+                  {'stream': False}),
+    'dynamic': ('create_dynamic_dashboard', 'build_dynamic_dashboard', 'Solution_Dashboard_Dynamic.xlsx',
+                {'stream': False, 'precompute': True}),
+}
+
+# Seconds a build may run before it is abandoned
+BUILD_TIMEOUT = 600
+
+# Seconds between attempts to take another worker's build lock
+LOCK_POLL_INTERVAL = 0.2
+
+
+class BuildError(RuntimeError):
+    """A report build failed or timed out"""
+
+
+def parse_options(name, args):
+    """The report's options, overridden by true/false query parameters in args"""
+    options = dict(REPORTS[name][3])
+    for key in options:
+        value = args.get(key)
+        if value is not None:
+            options[key] = value.lower() in ('1', 'true', 'yes', 'on')
+    return options
+
+
+def cache_name(name, sha256, options):
+    flags = '-'.join(f'{key}{int(value)}' for key, value in sorted(options.items()))
+    return f'{name}-{sha256[:16]}-{flags}.xlsx'
+
+
+class _BuildLock:
+    """Inter-process lock on one output file; polls so a gevent worker is never blocked in flock()"""
+
+    def __init__(self, path):
+        self.path = path + '.lock'
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            deadline = time.monotonic() + BUILD_TIMEOUT
+            while True:
+                try:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() > deadline:
+                        os.close(self._fd)
+                        raise BuildError('Timed out waiting for another build of this report')
+                    time.sleep(LOCK_POLL_INTERVAL)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+
+
+class ReportCache:
+    """Cached report workbooks for the data of one WorkbookStore"""
+
+    def __init__(self, store, cache_dir=None):
+        self.store = store
+        self.cache_dir = (cache_dir or os.environ.get(CACHE_DIR_ENV)
+                          or os.path.join(os.path.dirname(store.path), 'report_cache'))
+        self._lock = threading.Lock()
+        self._builds = {}   # output path -> Event set when its build ends
+
+    def path(self, name, dataset, options):
+        return os.path.join(self.cache_dir, cache_name(name, dataset.sha256, options))
+
+    def get(self, name, options):
+        """(path, Dataset) of the report for the current data, building it first if it isn't cached"""
+        dataset = self.store.get()
+        path = self.path(name, dataset, options)
+        if not os.path.exists(path):
+            try:
+                self._build_once(name, path, dataset.sha256, options)
+            except BuildError:
+                # An upload replaced the data mid-build: build for the new data instead
+                if self.store.get().sha256 == dataset.sha256:
+                    raise
+                return self.get(name, options)
+        return path, dataset
+
+    def _build_once(self, name, path, sha256, options):
+        with self._lock:
+            done = self._builds.get(path)
+            leader = done is None
+            if leader:
+                done = self._builds[path] = threading.Event()
+        if not leader:
+            done.wait(BUILD_TIMEOUT)
+            if not os.path.exists(path):
+                raise BuildError(f'Building the {name} report failed')
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with _BuildLock(path):
+                if not os.path.exists(path):    # another worker may have built it meanwhile
+                    self._run_build(name, path, sha256, options)
+                    self._prune(name, path, options)
+        finally:
+            with self._lock:
+                del self._builds[path]
+            done.set()
+
+    def _run_build(self, name, path, sha256, options):
+        tmp = f'{path}.{os.getpid()}.tmp'
+        command = [sys.executable, os.path.abspath(__file__), name, self.store.path, tmp, '--sha256', sha256]
+        command += [f'--{key}' for key, value in options.items() if value]
+        try:
+            result = subprocess.run(command, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    capture_output=True, text=True, timeout=BUILD_TIMEOUT)
+            if result.returncode != 0:
+                raise BuildError(f'Building the {name} report failed: {result.stderr.strip()[-500:]}')
+            os.replace(tmp, path)
+        except subprocess.TimeoutExpired:
+            raise BuildError(f'Building the {name} report timed out')
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _prune(self, name, keep, options):
+        """Remove this report's workbooks (and their lock files) for other data versions"""
+        suffix = cache_name(name, '', options)[len(name) + 1:]
+        for entry in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, entry)
+            if (entry.startswith(f'{name}-') and entry.endswith((suffix, suffix + '.lock'))
+                    and path not in (keep, keep + '.lock')):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def refresh(self):
+        """Build every report with its default options for the current data, in a background thread"""
+        def run():
+            try:
+                for name, (_, _, _, options) in REPORTS.items():
+                    self.get(name, options)
+            except (OSError, BuildError) as e:
+                print(f"Report refresh failed: {e}", file=sys.stderr)
+
+        thread = threading.Thread(target=run, name='report-refresh', daemon=True)
+        thread.start()
+        return thread
+
+
+def build(name, source, output, sha256=None, **options):
+    """Build one report from a source workbook; exits non-zero if its data no longer matches sha256"""
+    import importlib
+    import data_store
+
+    dataset = data_store.get_store(source).get()
+    if sha256 and not dataset.sha256.startswith(sha256):
+        sys.exit(f'{source} changed while the report was queued')
+    module, builder, _, _ = REPORTS[name]
+    return getattr(importlib.import_module(module), builder)(dataset, output, **options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build one report workbook (used by the server's report cache)")
+    parser.add_argument('report', choices=sorted(REPORTS))
+    parser.add_argument('source', help="source workbook")
+    parser.add_argument('output', help="where to write the report")
+    parser.add_argument('--sha256', help="only build if the source content still has this hash")
+    parser.add_argument('--stream', action='store_true')
+    parser.add_argument('--precompute', action='store_true')
+    args = parser.parse_args()
+    options = {key: getattr(args, key) for key in REPORTS[args.report][3]}
+    stats = build(args.report, args.source, args.output, args.sha256, **options)
+    print(json.dumps(stats, default=str))
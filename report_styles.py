@@ -0,0 +1,43 @@
+from functools import lru_cache
+
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+# openpyxl hashes and de-duplicates every style object assigned to a cell, so
+# the report builders share one instance per distinct style instead of building
+# a fresh Font/Border/Alignment per cell. Named styles go further: assigning
+# one by name sets all of a cell's style ids in a single step.
+
+
+@lru_cache(maxsize=None)
+def font(**attrs):
+    return Font(**attrs)
+
+
+@lru_cache(maxsize=None)
+def solid_fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+@lru_cache(maxsize=None)
+def box_border(color, style='thin'):
+    """Border on all four sides"""
+    side = Side(style=style, color=color)
+    return Border(left=side, right=side, top=side, bottom=side)
+
+
+@lru_cache(maxsize=None)
+def bottom_border(color, style='thin'):
+    return Border(bottom=Side(style=style, color=color))
+
+
+@lru_cache(maxsize=None)
+def align(horizontal='center', vertical='center'):
+    return Alignment(horizontal=horizontal, vertical=vertical)
+
+
+def apply(cell, name, **attrs):
+    """Give a cell a named style, adding it to the cell's workbook on first use"""
+    wb = cell.parent.parent
+    if name not in wb.named_styles:
+        wb.add_named_style(NamedStyle(name=name, **attrs))
+    cell.style = name
@@ -0,0 +1,310 @@
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from flask import Response, g, request, session
+
+# Directory shared by every gunicorn worker of one server; each worker keeps its
+# own series in memory and mirrors them to <dir>/<worker>.json, and /metrics sums
+# the files of all workers. Without it (flask run, Vercel) only this process counts.
+METRICS_DIR_ENV = 'METRICS_DIR'
+
+# Bearer token that lets a scraper read /metrics; otherwise a logged-in session is required
+METRICS_TOKEN_ENV = 'METRICS_TOKEN'
+
+# Seconds between snapshot writes of a worker with new requests
+FLUSH_INTERVAL = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'http_requests_total': ('counter', "Requests by route, method and status", None),
+    'http_request_duration_seconds': ('histogram', "Time until the response body was fully sent", LATENCY_BUCKETS),
+    'http_response_size_bytes': ('histogram', "Response body size, where known up front", SIZE_BUCKETS),
+    'http_login_redirects_total': ('counter', "Requests to protected routes sent to /login because the session was not logged in", None),
+    'http_requests_in_flight': ('gauge', "Requests being handled right now", None),
+}
+
+
+def metrics_dir():
+    return os.environ.get(METRICS_DIR_ENV)
+
+
+def prepare_dir(path=None):
+    """Create the shared directory and drop snapshots left by a previous server; call once in the master"""
+    path = path or metrics_dir() or os.path.join(tempfile.gettempdir(), f'solution-dashboard-metrics-{os.getpid()}')
+    os.makedirs(path, exist_ok=True)
+    for stale in glob.glob(os.path.join(path, '*.json')):
+        os.remove(stale)
+    os.environ[METRICS_DIR_ENV] = path
+    return path
+
+
+def remove_dir():
+    """Delete the shared directory's snapshots once every worker has exited"""
+    path = metrics_dir()
+    if path:
+        for name in glob.glob(os.path.join(path, '*.json*')):
+            os.remove(name)
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+
+
+class Registry:
+    """Counters and histograms of one process, keyed by (metric name, label values)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        # Unique per process: a recycled pid must not overwrite a dead worker's counts
+        self.worker_id = f'{self.pid}-{uuid.uuid4().hex[:8]}'
+        self.counters = {}      # (name, labels) -> value
+        self.histograms = {}    # (name, labels) -> [per-bucket counts..., sum, count]
+        self.in_flight = 0
+        self._dirty = False
+        self._flusher = None
+
+    def _ensure_flusher(self):
+        # Started lazily in each worker (after any fork); a preloaded app forks a copy of the master's registry
+        if self.pid != os.getpid():
+            with self._lock:
+                self._reset()
+        if metrics_dir() and (self._flusher is None or not self._flusher.is_alive()):
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + amount
+            self._dirty = True
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        with self._lock:
+            key = (name, labels)
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+            self._dirty = True
+
+    def add_in_flight(self, delta):
+        self._ensure_flusher()
+        with self._lock:
+            self.in_flight += delta
+            self._dirty = True
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'pid': self.pid,
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(series)] for (name, labels), series in self.histograms.items()],
+                'in_flight': self.in_flight,
+            }
+
+    def flush(self):
+        """Mirror this process's series to the shared directory if anything changed"""
+        path = metrics_dir()
+        if not path or not self._dirty or self.pid != os.getpid():
+            return
+        self._dirty = False
+        target = os.path.join(path, f'{self.worker_id}.json')
+        tmp = f'{target}.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp, target)
+        except OSError:
+            self._dirty = True
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect():
+    """Series summed over every worker: (counters, histograms, in_flight)"""
+    snapshots = [registry.snapshot()]
+    path = metrics_dir()
+    if path:
+        own = os.path.join(path, f'{registry.worker_id}.json')
+        for name in glob.glob(os.path.join(path, '*.json')):
+            if name == own:
+                continue
+            try:
+                with open(name) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue    # removed or replaced while reading
+
+    counters, histograms, in_flight = {}, {}, 0
+    for snap in snapshots:
+        for name, labels, value in snap['counters']:
+            key = (name, tuple(labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, series in snap['histograms']:
+            key = (name, tuple(labels))
+            total = histograms.get(key)
+            histograms[key] = series if total is None else [a + b for a, b in zip(total, series)]
+        # Counts of exited workers still add up; their in-flight requests are gone
+        if snap['pid'] == registry.pid or _pid_alive(snap['pid']):
+            in_flight += snap['in_flight']
+    return counters, histograms, in_flight
+
+
+# ==================== EXPOSITION ====================
+
+LABEL_NAMES = {
+    'http_requests_total': ('route', 'method', 'status'),
+    'http_request_duration_seconds': ('route', 'method'),
+    'http_response_size_bytes': ('route', 'method'),
+    'http_login_redirects_total': ('route',),
+}
+
+
+INF_LABEL = 'le="+Inf"'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (0.0.4)"""
+    counters, histograms, in_flight = collect()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        names = LABEL_NAMES.get(name, ())
+        if kind == 'gauge':
+            lines.append(f'{name} {in_flight}')
+        elif kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_labels(names, labels)} {_number(value)}')
+        else:
+            for (metric, labels), series in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets, series):
+                    cumulative += count
+                    le = 'le="%s"' % _number(bound)
+                    lines.append(f'{name}_bucket{_labels(names, labels, le)} {cumulative}')
+                lines.append(f'{name}_bucket{_labels(names, labels, INF_LABEL)} {series[-1]}')
+                lines.append(f'{name}_sum{_labels(names, labels)} {_number(series[-2])}')
+                lines.append(f'{name}_count{_labels(names, labels)} {series[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+# ==================== FLASK HOOKS ====================
+
+def _route():
+    # The URL rule, not the path, so /<path:filename> is one series rather than one per file
+    return request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+
+
+def _before():
+    g.metrics_start = time.perf_counter()
+    g.metrics_in_flight = True
+    registry.add_in_flight(1)
+
+
+def _after(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    route, method, status = _route(), request.method, response.status_code
+    size = response.content_length
+    login_redirect = g.pop('metrics_login_redirect', False)
+    # From here the request stays in flight until the server has sent the body
+    in_flight = g.pop('metrics_in_flight', False)
+
+    # Streamed bodies (/events, /export, files) are still being sent when the handler returns
+    def finished():
+        registry.inc('http_requests_total', (route, method, str(status)))
+        registry.observe('http_request_duration_seconds', (route, method), time.perf_counter() - start)
+        if size is not None:
+            registry.observe('http_response_size_bytes', (route, method), size)
+        if login_redirect:
+            registry.inc('http_login_redirects_total', (route,))
+        if in_flight:
+            registry.add_in_flight(-1)
+
+    response.call_on_close(finished)
+    return response
+
+
+def login_redirect():
+    """Count this request as bounced to the login page by a protected route (call from login_required)"""
+    g.metrics_login_redirect = True
+
+
+def _teardown(exc):
+    # Only when _after never ran for this request
+    if g.pop('metrics_in_flight', False):
+        registry.add_in_flight(-1)
+
+
+def metrics_view():
+    token = os.environ.get(METRICS_TOKEN_ENV)
+    authorized = 'logged_in' in session or (token and request.headers.get('Authorization') == f'Bearer {token}')
+    if not authorized:
+        return Response('Unauthorized\n', 401, mimetype='text/plain')
+    return Response(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def install(app):
+    """Record every request of app and serve the totals on /metrics"""
+    app.before_request(_before)
+    app.after_request(_after)
+    app.teardown_request(_teardown)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
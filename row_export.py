@@ -0,0 +1,113 @@
+import csv
+import io
+import os
+import tempfile
+
+import numpy as np
+
+import aggregation
+import report_styles as rs
+import sheet_writer
+
+# Columns of an export, as exportCSV() in app.js always wrote them
+HEADERS = ('Solution Name', 'Division', 'Focus Area', 'Stage', 'SMV Unlock', 'OH Reduction', 'Other Savings', 'Total')
+
+# Drill-through selection, narrowing the filtered rows like drillThrough() in app.js
+DRILL_PARAMS = {'drill_division': 'division', 'drill_stage': 'stage', 'drill_focus': 'focus'}
+
+FORMATS = {
+    'csv': 'text/csv',     # Werkzeug adds '; charset=utf-8' to text/* types
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Rows formatted per yielded chunk; bounds memory however many rows match
+CHUNK_ROWS = 2000
+
+# Bytes per chunk when streaming a finished workbook
+FILE_CHUNK_BYTES = 256 * 1024
+
+XLSX_WIDTHS = (40, 18, 24, 16, 14, 14, 14, 14)
+
+
+def select_rows(dataset, args):
+    """Indices of the rows matching the dashboard filters and drill-through in args (a request.args)"""
+    rows = aggregation.filter_rows(dataset, **{key: args.get(key, '') for key in aggregation.FILTER_PARAMS})
+    drill = {key: args.get(param, '') for param, key in DRILL_PARAMS.items()}
+    if any(drill.values()):
+        drilled = np.intersect1d(rows, aggregation.filter_rows(dataset, **drill), assume_unique=True)
+        # An empty drill-through shows the filtered rows, as on the dashboard
+        if len(drilled):
+            rows = drilled
+    return rows
+
+
+def _chunks(dataset, rows):
+    """Lists of export rows, CHUNK_ROWS at a time"""
+    names = dataset.names()
+    labels = [dataset.labels(aggregation.KEYS[key]) for key in ('division', 'focus', 'stage')]
+    savings = [dataset.savings(aggregation.KEYS[key]) for key in ('smv', 'oh', 'other')]
+    for start in range(0, len(rows), CHUNK_ROWS):
+        chunk = rows[start:start + CHUNK_ROWS]
+        columns = [[names[i] for i in chunk.tolist()]]
+        columns += [[values[c] for c in codes[chunk].tolist()] for values, codes in labels]
+        smv, oh, other = (column[chunk].tolist() for column in savings)
+        columns += [smv, oh, other, [s + o + x for s, o, x in zip(smv, oh, other)]]
+        yield list(zip(*columns))
+
+
+def _number(value):
+    # Same text as String(number) in JavaScript: 2 rather than 2.0
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def iter_csv(dataset, rows):
+    """The export as CSV text chunks, every field quoted"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator='\n')
+    writer.writerow(HEADERS)
+    for chunk in _chunks(dataset, rows):
+        writer.writerows(row[:4] + tuple(_number(v) for v in row[4:]) for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()     # header only: no rows matched
+
+
+def write_xlsx(dataset, rows):
+    """Save the export to a temporary .xlsx through a write-only workbook and return its path"""
+    wb = sheet_writer.new_workbook(stream=True)
+    ws = wb.create_sheet('Export')
+    sheet_writer.set_widths(ws, XLSX_WIDTHS)
+    ws.freeze_panes = 'A2'
+    header_font = rs.font(bold=True)
+
+    def style_header(cell):
+        cell.font = header_font
+
+    ws.append(sheet_writer.cells(ws, HEADERS, style_header))
+    for chunk in _chunks(dataset, rows):
+        for row in chunk:
+            ws.append(row)
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        wb.save(path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def iter_file(path):
+    """Stream a file in chunks, deleting it once read (or abandoned)"""
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(FILE_CHUNK_BYTES)
+                if not data:
+                    break
+                yield data
+    finally:
+        os.remove(path)
@@ -0,0 +1,149 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from data_store import normalize
+
+# Row snapshots kept for /rows?since=<version>, in memory and on disk
+HISTORY_SIZE = 8
+
+# Directory of row snapshots next to the workbook, shared by gunicorn workers
+HISTORY_SUFFIX = '.rows'
+
+# Tokens made by sync_version(); anything else is never looked up on disk
+VERSION_PATTERN = re.compile(r'\d+-[0-9a-f]{12}')
+
+
+def sync_version(dataset):
+    """Opaque version token for a Dataset: upload counter plus content hash"""
+    return f'{dataset.version}-{dataset.sha256[:12]}'
+
+
+def history_dir(path):
+    return path + HISTORY_SUFFIX
+
+
+def _cell(value):
+    # Same blanks as XLSX.utils.sheet_to_json(sheet, { defval: "" }) in app.js
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return value
+
+
+def snapshot(dataset):
+    """Rows keyed on Division + Solution Name, in sheet order"""
+    columns = [(name, dataset.column(name)) for name in dataset.header]
+    divisions = dataset.column('Division') if 'Division' in dataset.header else [None] * dataset.length
+    names = dataset.column('Solution Name') if 'Solution Name' in dataset.header else [None] * dataset.length
+
+    rows = OrderedDict()
+    for i in range(dataset.length):
+        key = f'{normalize(divisions[i])}|{normalize(names[i])}'
+        if key in rows:
+            # Duplicate solution names within a division keep their own slot
+            n = 2
+            while f'{key}#{n}' in rows:
+                n += 1
+            key = f'{key}#{n}'
+        row = {name: _cell(values[i]) for name, values in columns}
+        row['_key'] = key
+        rows[key] = row
+    return rows
+
+
+class RowHistory:
+    """Recent row snapshots, used to answer delta requests
+
+    With a directory, each snapshot is also saved there as JSON, so a worker
+    can answer a delta from a version that another worker served.
+    """
+
+    def __init__(self, size=HISTORY_SIZE, directory=None):
+        self.size = size
+        self.directory = directory
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _rows(self, dataset):
+        version = sync_version(dataset)
+        with self._lock:
+            rows = self._snapshots.get(version)
+        if rows is None:
+            rows = snapshot(dataset)
+            with self._lock:
+                self._snapshots[version] = rows
+                while len(self._snapshots) > self.size:
+                    self._snapshots.popitem(last=False)
+            self._save(version, rows)
+        return version, rows
+
+    def _path(self, version):
+        return os.path.join(self.directory, f'{version}.json')
+
+    def _save(self, version, rows):
+        if not self.directory or os.path.exists(self._path(version)):
+            return
+        try:
+            data = json.dumps(list(rows.values()))
+        except (TypeError, ValueError):
+            return      # e.g. date cells: other workers answer with the full rows
+        path = self._path(version)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._prune()
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _prune(self):
+        """Keep the newest `size` saved snapshots"""
+        saved = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+        saved.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+        for entry in saved[self.size:]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _load(self, version):
+        """Rows saved for a version by any worker, or None"""
+        if not self.directory or not VERSION_PATTERN.fullmatch(version):
+            return None
+        try:
+            with open(self._path(version), 'r', encoding='utf-8') as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return OrderedDict((row['_key'], row) for row in rows)
+
+    def delta(self, dataset, since=None):
+        """Rows added, changed and removed since a version (plus the key order if rows moved); the full row set if that version is unknown"""
+        version, rows = self._rows(dataset)
+        with self._lock:
+            old = self._snapshots.get(since) if since else None
+        if old is None and since:
+            old = self._load(since)
+
+        if old is None:
+            return {'version': version, 'full': True, 'rows': list(rows.values())}
+
+        if old is rows:
+            return {'version': version, 'full': False, 'added': [], 'changed': [], 'removed': []}
+
+        added = [row for key, row in rows.items() if key not in old]
+        changed = [row for key, row in rows.items() if key in old and old[key] != row]
+        removed = [key for key in old if key not in rows]
+        delta = {'version': version, 'full': False, 'added': added, 'changed': changed, 'removed': removed}
+
+        # Clients append added rows after the kept ones; send the sheet order when that isn't it
+        patched = [key for key in old if key in rows] + [row['_key'] for row in added]
+        if patched != list(rows):
+            delta['order'] = list(rows)
+        return delta
@@ -1,9 +1,20 @@
-from flask import Flask, render_template, request, redirect, url_for, session, send_file, jsonify, send_from_directory
+from flask import Flask, render_template, request, redirect, url_for, session, send_file, jsonify, Response, abort
 from functools import wraps
+import io
 import os
 
+import aggregation
+import data_store
+import live_updates
+import report_cache
+import request_metrics
+import row_export
+import row_sync
+import static_assets
+
 app = Flask(__name__, static_folder='.', static_url_path='')
 app.secret_key = 'solution-dashboard-secret-key-2024'
+app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # Reject oversized uploads with 413
 
 # Authentication credentials
 USERS = {
@@ -11,11 +22,31 @@ USERS = {
 }
 
 EXCEL_FILE = 'Solution List.xlsx'
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Parsed workbook shared by every read route; re-parsed only when the file changes
+store = data_store.get_store(EXCEL_FILE)
+
+# Recent row snapshots for incremental /rows?since=<version> sync, shared on disk by all workers
+row_history = row_sync.RowHistory(directory=row_sync.history_dir(EXCEL_FILE))
+
+# Pushes a version event to /events subscribers whenever EXCEL_FILE is replaced
+notifier = live_updates.ChangeNotifier(EXCEL_FILE)
+
+# Report workbooks per data version, rebuilt in the background after each upload
+reports = report_cache.ReportCache(store)
+
+# Static files with precompressed (gzip/brotli) and content-hashed variants
+static_index = static_assets.StaticIndex(app.static_folder)
+
+# Per-route latency, size and status counts on /metrics, summed over gunicorn workers
+request_metrics.install(app)
 
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'logged_in' not in session:
+            request_metrics.login_redirect()
             return redirect(url_for('login'))
         return f(*args, **kwargs)
     return decorated_function
@@ -50,7 +81,11 @@ def dashboard():
 @login_required
 def download_excel():
     if os.path.exists(EXCEL_FILE):
-        return send_file(EXCEL_FILE, as_attachment=True, download_name=EXCEL_FILE)
+        dataset = store.get()
+        # Strong validators so unchanged workbooks are answered with 304 Not Modified
+        return send_file(io.BytesIO(dataset.content), mimetype=XLSX_MIMETYPE,
+                         as_attachment=True, download_name=EXCEL_FILE,
+                         etag=dataset.sha256, last_modified=dataset.mtime, conditional=True)
     return jsonify({'error': 'File not found'}), 404
 
 @app.route('/upload-excel', methods=['POST'])
@@ -64,22 +99,122 @@ def upload_excel():
         return jsonify({'error': 'No file selected'}), 400
 
     if file and file.filename.endswith('.xlsx'):
-        file.save(EXCEL_FILE)
-        return jsonify({'success': True, 'message': 'File uploaded successfully!'})
+        try:
+            version = store.replace(file.stream)
+        except data_store.UploadError as e:
+            return jsonify({'error': str(e)}), 400
+        notifier.notify()
+        reports.refresh()
+        return jsonify({'success': True, 'message': 'File uploaded successfully!', 'version': version})
 
     return jsonify({'error': 'Invalid file type. Please upload an Excel file (.xlsx)'}), 400
 
+def get_aggregates(dataset):
+    """Aggregates over the rows matching the division/stage/focus/search query parameters"""
+    filters = {key: request.args.get(key, '') for key in aggregation.FILTER_PARAMS}
+    return aggregation.aggregate(dataset, aggregation.filter_rows(dataset, **filters))
+
+# ========== AGGREGATION API ==========
+@app.route('/api/summary')
+@login_required
+def api_summary():
+    if not os.path.exists(EXCEL_FILE):
+        return jsonify({'error': 'File not found'}), 404
+    dataset = store.get()
+    summary = aggregation.build_summary(get_aggregates(dataset))
+    summary['options'] = aggregation.filter_options(dataset)
+    return jsonify(summary)
+
+@app.route('/api/matrix')
+@login_required
+def api_matrix():
+    if not os.path.exists(EXCEL_FILE):
+        return jsonify({'error': 'File not found'}), 404
+    dataset = store.get()
+    return jsonify(aggregation.build_matrix(get_aggregates(dataset)))
+
+@app.route('/api/rankings')
+@login_required
+def api_rankings():
+    if not os.path.exists(EXCEL_FILE):
+        return jsonify({'error': 'File not found'}), 404
+    dataset = store.get()
+    return jsonify(aggregation.build_rankings(get_aggregates(dataset)))
+
+@app.route('/rows')
+@login_required
+def rows():
+    if not os.path.exists(EXCEL_FILE):
+        return jsonify({'error': 'File not found'}), 404
+    return jsonify(row_history.delta(store.get(), request.args.get('since')))
+
+@app.route('/export')
+@login_required
+def export():
+    """Rows matching the dashboard filters (and drill-through), streamed as ?format=csv (default) or xlsx"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in row_export.FORMATS:
+        return jsonify({'error': 'Unsupported export format'}), 400
+    if not os.path.exists(EXCEL_FILE):
+        return jsonify({'error': 'File not found'}), 404
+    dataset = store.get()
+    selected = row_export.select_rows(dataset, request.args)
+    headers = {'Content-Disposition': f'attachment; filename=solution_savings_export.{fmt}',
+               'Cache-Control': 'no-store'}
+    if fmt == 'csv':
+        return Response(row_export.iter_csv(dataset, selected), mimetype=row_export.FORMATS[fmt], headers=headers)
+    path = row_export.write_xlsx(dataset, selected)
+    headers['Content-Length'] = str(os.path.getsize(path))
+    return Response(row_export.iter_file(path), mimetype=row_export.FORMATS[fmt], headers=headers)
+
+# ========== REPORTS ==========
+@app.route('/reports/<name>.xlsx')
+@login_required
+def report(name):
+    """create_dashboard / create_dynamic_dashboard output for the current data, from the cache"""
+    if name not in report_cache.REPORTS:
+        abort(404)
+    if not os.path.exists(EXCEL_FILE):
+        return jsonify({'error': 'File not found'}), 404
+    try:
+        path, dataset = reports.get(name, report_cache.parse_options(name, request.args))
+    except report_cache.BuildError as e:
+        return jsonify({'error': str(e)}), 500
+    return send_file(os.path.abspath(path), mimetype=XLSX_MIMETYPE, as_attachment=True,
+                     download_name=report_cache.REPORTS[name][2], etag=os.path.basename(path),
+                     last_modified=dataset.mtime, conditional=True)
+
+@app.route('/api/cache-stats')
+@login_required
+def api_cache_stats():
+    return jsonify(store.snapshot_stats())
+
+@app.route('/events')
+@login_required
+def events():
+    return Response(notifier.stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/check-auth')
 def check_auth():
     if 'logged_in' in session:
         return jsonify({'authenticated': True, 'username': session.get('username')})
     return jsonify({'authenticated': False})
 
+# Built-in static route (matched before serve_static): the built bundles and pages
+# are public, with Accept-Encoding negotiated against the precompressed build;
+# every other file in the app folder needs a login
+@app.endpoint('static')
+def send_static(filename):
+    if not static_index.is_public(filename):
+        return serve_static(filename)
+    return static_index.send(filename) or abort(404)
+
 # Serve static files
 @app.route('/<path:filename>')
 @login_required
 def serve_static(filename):
-    return send_from_directory('.', filename)
+    return static_index.send(filename) or abort(404)
 
 if __name__ == '__main__':
     import os
@@ -0,0 +1,176 @@
+import io
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+from copy import copy
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn
+
+# The report builders write every sheet top to bottom through ws.append(), so
+# the same code runs against a normal Workbook() and a Workbook(write_only=True).
+# In streaming mode rows go straight to disk and memory stays flat however many
+# rows the Data sheet has. Column widths and row heights of write-only sheets
+# must be set before the rows they apply to are appended.
+
+
+def new_workbook(stream=False):
+    """Empty workbook; write-only (rows streamed to disk) when stream is set"""
+    wb = Workbook(write_only=stream)
+    if not stream:
+        wb.remove(wb.active)
+    return wb
+
+
+def scratch_sheet(title):
+    """In-memory sheet for free-form layouts, copied into the report with copy_sheet()"""
+    ws = Workbook().active
+    ws.title = title
+    return ws
+
+
+def set_widths(ws, widths, first_col=1):
+    for col, width in enumerate(widths, first_col):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+
+def cells(ws, values, style=None):
+    """A row of cells for ws.append(), each passed through style(cell) if given"""
+    row = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value)
+        if style is not None:
+            style(cell)
+        row.append(cell)
+    return row
+
+
+def add_table(ws, name, headers, last_row, first_row=1):
+    """Excel Table over headers at first_row and data down to last_row (at least one data row)"""
+    ref = f'A{first_row}:{get_column_letter(len(headers))}{max(last_row, first_row + 1)}'
+    table = Table(displayName=name, ref=ref)
+    # Named explicitly: write-only sheets can't be read back for the header cells
+    table.tableColumns = [TableColumn(id=i, name=header) for i, header in enumerate(headers, 1)]
+    table.autoFilter = AutoFilter(ref=ref)
+    ws.add_table(table)
+    return table
+
+
+class RowWriter:
+    """Appends rows in order, padding with empty rows to reach a given row number"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.row = 0    # last row written
+
+    def append(self, values, row=None):
+        """Write values at row (default: the next row) and return its row number"""
+        if row is not None:
+            if row <= self.row:
+                raise ValueError(f'Row {row} of {self.ws.title} was already written')
+            while self.row < row - 1:
+                self.ws.append([])
+                self.row += 1
+        self.ws.append(values)
+        self.row += 1
+        return self.row
+
+
+SHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+
+# calcId of current Excel builds: files saved by an older calc engine are fully
+# recalculated on open, which would throw the cached values away
+EXCEL_CALC_ID = 191029
+
+
+def _with_cached_values(data, values):
+    """Sheet XML with a <v> cached result added to each formula cell listed in values"""
+    for _, (prefix, uri) in ET.iterparse(io.BytesIO(data), events=('start-ns',)):
+        ET.register_namespace(prefix, uri)
+    root = ET.fromstring(data)
+    for c in root.iter(f'{{{SHEET_NS}}}c'):
+        value = values.get(c.get('r'))
+        if value is None or c.find(f'{{{SHEET_NS}}}f') is None:
+            continue
+        v = c.find(f'{{{SHEET_NS}}}v')
+        if v is None:
+            v = ET.SubElement(c, f'{{{SHEET_NS}}}v')
+        if isinstance(value, bool):
+            c.set('t', 'b')
+            v.text = '1' if value else '0'
+        elif isinstance(value, (int, float)):
+            c.attrib.pop('t', None)
+            v.text = repr(float(value)) if isinstance(value, float) else str(value)
+        else:
+            c.set('t', 'str')
+            v.text = str(value)
+    return ET.tostring(root, encoding='UTF-8', xml_declaration=True)
+
+
+class CachedValues:
+    """Precomputed results of formula cells, saved as the cells' cached values"""
+
+    def __init__(self):
+        self._values = {}   # sheet title -> coordinate -> value
+
+    def set(self, ws, row, column, value):
+        self._values.setdefault(ws.title, {})[f'{get_column_letter(column)}{row}'] = value
+
+    def set_row(self, ws, row, values, first_col=1):
+        for column, value in enumerate(values, first_col):
+            self.set(ws, row, column, value)
+
+    def save(self, wb, path):
+        """Save wb with the cached values in place, so it opens with correct numbers and no recalc"""
+        wb.calculation.fullCalcOnLoad = False
+        wb.calculation.calcId = EXCEL_CALC_ID
+        wb.save(path)
+
+        parts = {ws.path.lstrip('/'): self._values[ws.title] for ws in wb.worksheets if ws.title in self._values}
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with zipfile.ZipFile(path) as src, zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for item in src.infolist():
+                data = src.read(item.filename)
+                if item.filename in parts:
+                    data = _with_cached_values(data, parts[item.filename])
+                dst.writestr(item, data)
+        os.replace(tmp, path)
+
+
+def _copy_cell(ws, source):
+    if source.value is None and not source.has_style:
+        return None
+    cell = WriteOnlyCell(ws, source.value)
+    if source.has_style:
+        cell.font = copy(source.font)
+        cell.fill = copy(source.fill)
+        cell.border = copy(source.border)
+        cell.alignment = copy(source.alignment)
+        cell.number_format = source.number_format
+        cell.protection = copy(source.protection)
+    return cell
+
+
+def copy_sheet(source, ws):
+    """Write a finished in-memory sheet into ws: cells, merges, dimensions, charts and view"""
+    for key, dim in source.column_dimensions.items():
+        ws.column_dimensions[key].width = dim.width
+    for idx, dim in source.row_dimensions.items():
+        if dim.height is not None:
+            ws.row_dimensions[idx].height = dim.height
+    ws.sheet_view.showGridLines = source.sheet_view.showGridLines
+    if source.print_area:
+        ws.print_area = source.print_area.split('!')[-1]
+    for merged in source.merged_cells.ranges:
+        ws.merged_cells.add(merged.coord)
+    for rule_range in source.conditional_formatting:
+        for rule in rule_range.rules:
+            ws.conditional_formatting.add(rule_range.sqref, rule)
+    for chart in source._charts:
+        ws.add_chart(chart)
+
+    for row in source.iter_rows():
+        ws.append([_copy_cell(ws, cell) for cell in row])
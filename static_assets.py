@@ -0,0 +1,168 @@
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import Response, request, send_file
+from werkzeug.security import safe_join
+
+import build_assets
+
+# Files at or below this size are kept in memory once requested
+SMALL_FILE_BYTES = 64 * 1024
+
+# Upper bound for the in-memory cache of small files
+CACHE_BUDGET_BYTES = 1024 * 1024
+
+# Content-hashed bundles never change under the same name
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+SKIP_DIRS = {'__pycache__', 'node_modules', 'venv', '.venv', build_assets.BUILD_DIR}
+
+
+class Asset:
+    """Index entry for one static file"""
+
+    __slots__ = ('path', 'mimetype', 'size', 'mtime_ns', 'etag', 'last_modified', 'immutable', 'variants')
+
+    def __init__(self, path, st, mimetype=None, immutable=False, variants=None):
+        self.path = path
+        self.mimetype = mimetype or mimetypes.guess_type(path)[0] or 'text/plain'
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        self.etag = f'{st.st_mtime_ns:x}-{st.st_size:x}'
+        self.last_modified = datetime.fromtimestamp(st.st_mtime, timezone.utc)
+        self.immutable = immutable
+        self.variants = variants or {}    # content-coding -> precompressed file path
+
+    def matches(self, st):
+        return (st.st_mtime_ns, st.st_size) == (self.mtime_ns, self.size)
+
+    def refreshed(self, st):
+        return Asset(self.path, st, self.mimetype, self.immutable, self.variants)
+
+
+class StaticIndex:
+    """Startup-built path -> (mimetype, size, etag) index with a bounded cache of small files"""
+
+    def __init__(self, root, small_file_bytes=SMALL_FILE_BYTES, cache_budget=CACHE_BUDGET_BYTES, precompress=True):
+        self.root = root
+        self.small_file_bytes = small_file_bytes
+        self.cache_budget = cache_budget
+        self._assets = {}
+        self._cache = OrderedDict()   # (filename, coding) -> (etag, bytes), least recently used first
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self._public = set(build_assets.ASSETS + build_assets.PAGES)
+        self._build()
+        if precompress:
+            self._add_build(build_assets.ensure_built(root))
+
+    def _build(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRS]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+                self._assets[rel] = Asset(path, os.stat(path))
+
+    def _add_build(self, manifest):
+        """Serve hashed bundles and rewritten pages from the precompressed build"""
+        if manifest is None:
+            return
+        out_dir = os.path.join(self.root, build_assets.BUILD_DIR)
+        for name, info in manifest['files'].items():
+            path = os.path.join(out_dir, info['name'])
+            if not os.path.exists(path):
+                continue
+            variants = {coding: path + suffix for coding, suffix in build_assets.ENCODINGS.items()
+                        if os.path.exists(path + suffix)}
+            self._assets[info['name']] = Asset(path, os.stat(path), mimetypes.guess_type(name)[0],
+                                               info['immutable'], variants)
+            self._public.add(info['name'])
+
+    def is_public(self, filename):
+        """Whether a request path is one of the built bundles or pages, safe to serve without a login"""
+        return filename in self._public
+
+    def lookup(self, filename):
+        """Current Asset for a request path, or None; re-indexes files that changed on disk"""
+        asset = self._assets.get(filename)
+        path = asset.path if asset is not None else safe_join(self.root, filename)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not os.path.isfile(path):
+            return None
+        if asset is None:
+            asset = self._assets[filename] = Asset(path, st)
+        elif not asset.matches(st):
+            asset = self._assets[filename] = asset.refreshed(st)
+        return asset
+
+    def _negotiate(self, asset):
+        """Best precompressed variant the client accepts, as (coding, path)"""
+        best = (None, asset.path)
+        best_quality = 0
+        for coding, path in asset.variants.items():
+            quality = request.accept_encodings[coding]
+            if quality > best_quality:
+                best, best_quality = (coding, path), quality
+        return best
+
+    def _cached_body(self, key, etag, path):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == etag:
+                self._cache.move_to_end(key)
+                return entry[1]
+
+        with open(path, 'rb') as f:
+            body = f.read()
+
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self._cached_bytes -= len(old[1])
+            self._cache[key] = (etag, body)
+            self._cached_bytes += len(body)
+            while self._cached_bytes > self.cache_budget and self._cache:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+        return body
+
+    def send(self, filename):
+        """Conditional, range-aware response for a static file (None if it does not exist)"""
+        asset = self.lookup(filename)
+        if asset is None:
+            return None
+
+        coding, path = self._negotiate(asset)
+        etag = f'{asset.etag}-{coding}' if coding else asset.etag
+        size = os.path.getsize(path) if coding else asset.size
+
+        if size <= self.small_file_bytes:
+            response = Response(self._cached_body((filename, coding), etag, path), mimetype=asset.mimetype)
+            response.set_etag(etag)
+            response.last_modified = asset.last_modified
+        else:
+            # Large files stream from disk (wsgi.file_wrapper / sendfile under gunicorn)
+            response = send_file(path, mimetype=asset.mimetype, etag=etag,
+                                 last_modified=asset.last_modified, conditional=False)
+
+        if coding:
+            response.content_encoding = coding
+        if asset.variants:
+            response.vary.add('Accept-Encoding')
+        if asset.immutable:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        else:
+            response.cache_control.no_cache = True
+        return response.make_conditional(request, accept_ranges=True, complete_length=size)
@@ -0,0 +1,31 @@
+import hashlib
+import io
+import os
+import sys
+
+from openpyxl import Workbook
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+import data_store  # noqa: E402
+
+
+def workbook_bytes(rows, header=data_store.REQUIRED_COLUMNS):
+    """.xlsx content with a header row and the given rows"""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(list(header))
+    for row in rows:
+        ws.append(list(row))
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def make_dataset(rows, header=data_store.REQUIRED_COLUMNS, version=0):
+    """Dataset parsed from a workbook of the given rows, as WorkbookStore would load it"""
+    content = workbook_bytes(rows, header)
+    return data_store.parse_workbook(content, (0, len(content), hashlib.sha256(content).hexdigest()), version)
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+import aggregation
+from conftest import make_dataset
+
+# (Division, Solution Name, Focus Area, Stage, SMV Unlock, OH Reduction, Other Savings)
+ROWS = [
+    ('Kreeda', 'Sewing Robot', 'Automation', 'R&D', 1.5, 10, 0),
+    ('Kreeda', 'Smart Cutting', 'Automation', 'Trial', 2, None, 5),
+    ('Linea Aqua', 'Dye Saver', 'Sustainability', 'Commercialized', None, 20, 1),
+    (' Linea Aqua ', 'Water Loop', 'Sustainability', 'R&D', 0.5, '3 hrs', 0),
+    (None, 'Orphan Idea', 'Automation', 'Trial', 1, 0, 0),
+]
+
+
+@pytest.fixture
+def dataset():
+    return make_dataset(ROWS)
+
+
+@pytest.mark.parametrize('filters, expected', [
+    ({}, [0, 1, 2, 3, 4]),
+    ({'division': 'Kreeda'}, [0, 1]),
+    ({'division': 'Linea Aqua'}, [2, 3]),       # ' Linea Aqua ' is trimmed
+    ({'division': 'Unspecified'}, [4]),         # blank cells
+    ({'division': 'Nowhere'}, []),
+    ({'stage': 'R&D', 'focus': 'Sustainability'}, [3]),
+    ({'search': '  SMART '}, [1]),
+    ({'search': 'o', 'division': 'Kreeda'}, [0]),
+])
+def test_filter_rows(dataset, filters, expected):
+    assert aggregation.filter_rows(dataset, **filters).tolist() == expected
+
+
+def test_filter_options(dataset):
+    assert aggregation.filter_options(dataset) == {
+        'division': ['Kreeda', 'Linea Aqua', 'Unspecified'],
+        'stage': ['Commercialized', 'R&D', 'Trial'],
+        'focus': ['Automation', 'Sustainability'],
+    }
+
+
+def test_summary_counts_blanks_as_zero(dataset):
+    summary = aggregation.build_summary(aggregation.aggregate(dataset))
+    assert summary['kpis'] == {'count': 5, 'smv': 5.0, 'oh': 33.0, 'other': 6.0, 'total': 44.0}
+    assert summary['division']['Kreeda'] == {'count': 2, 'smv': 3.5, 'oh': 10.0, 'other': 5.0, 'total': 18.5}
+    assert summary['division']['Linea Aqua'] == {'count': 2, 'smv': 0.5, 'oh': 23.0, 'other': 1.0, 'total': 24.5}
+    assert list(summary['stage']) == ['Commercialized', 'R&D', 'Trial']
+
+
+def test_aggregate_over_filtered_rows(dataset):
+    rows = aggregation.filter_rows(dataset, division='Kreeda')
+    agg = aggregation.aggregate(dataset, rows)
+    assert aggregation.build_kpis(agg)['count'] == 2
+    # Labels of rows outside the filter are dropped from the groups
+    assert list(aggregation.group_by(agg, 'division')) == ['Kreeda']
+    assert list(aggregation.group_by(agg, 'focus')) == ['Automation']
+
+
+def test_aggregate_of_no_rows(dataset):
+    agg = aggregation.aggregate(dataset, np.empty(0, dtype=np.intp))
+    assert aggregation.build_kpis(agg) == {'count': 0, 'smv': 0.0, 'oh': 0.0, 'other': 0.0, 'total': 0.0}
+    assert aggregation.build_rankings(agg) == {'rankings': [], 'insights': {}}
+
+
+def test_matrix_totals(dataset):
+    matrix = aggregation.build_matrix(aggregation.aggregate(dataset))
+    assert matrix['stages'] == ['Commercialized', 'R&D', 'Trial']
+    assert matrix['focuses'] == ['Automation', 'Sustainability']
+    assert matrix['cells']['R&D']['Automation']['count'] == 1
+    assert matrix['cells']['Trial']['Sustainability']['count'] == 0
+    assert matrix['grand']['total'] == 44.0
+    for stage, totals in matrix['stage_totals'].items():
+        assert sum(cell['count'] for cell in matrix['cells'][stage].values()) == totals['count']
+
+
+def test_rankings(dataset):
+    result = aggregation.build_rankings(aggregation.aggregate(dataset))
+    assert [(r['rank'], r['division']) for r in result['rankings']] == [
+        (1, 'Linea Aqua'), (2, 'Kreeda'), (3, 'Unspecified')]
+    assert result['insights'] == {
+        'top_division': 'Linea Aqua',
+        'best_smv': 'Kreeda',
+        'best_oh': 'Linea Aqua',
+        'most_solutions': {'division': 'Kreeda', 'count': 2},
+        'commercialized': 1,
+        'rnd': 2,
+    }
+
+
+def test_insights_count_stage_case_variants_together():
+    rows = ROWS + [('Kreeda', 'Loom Sensor', 'Automation', 'r&d', 0, 0, 0),
+                   ('Kreeda', 'Pick Assist', 'Automation', 'R&D ', 0, 0, 0),
+                   ('Kreeda', 'Heat Press', 'Automation', 'COMMERCIALIZED', 0, 0, 0)]
+    insights = aggregation.build_rankings(aggregation.aggregate(make_dataset(rows)))['insights']
+    assert insights['rnd'] == 4
+    assert insights['commercialized'] == 2
+
+
+def test_frame_matches_pandas_groupby(dataset):
+    df = dataset.to_dataframe()
+    df['Division'] = df['Division'].map(lambda v: 'Unspecified' if v is None else str(v).strip())
+    expected = df.groupby('Division')[['SMV Unlock', 'OH Reduction']].sum()
+    frame = aggregation.aggregate(dataset).frame('division').set_index('Division')
+    assert frame['SMV Unlock'].tolist() == expected['SMV Unlock'].tolist()
+    assert frame['OH Reduction'].tolist() == expected['OH Reduction'].tolist()
+    assert frame['Solution Count'].tolist() == [2, 2, 1]
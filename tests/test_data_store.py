@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+import data_store
+from conftest import workbook_bytes
+
+ROWS = [
+    ('Kreeda', 'Sewing Robot', 'Automation', 'R&D', 1.5, 10, 0),
+    ('Kreeda', 'Smart Cutting', 'Automation', 'Trial', 2, None, 5),
+    ('Linea Aqua', 'Dye Saver', 'Sustainability', 'Commercialized', None, 20, 1),
+    (' Linea Aqua ', 'Water Loop', 'Sustainability', 'R&D', 0.5, '3 hrs', 0),
+]
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    path = tmp_path / 'Solution List.xlsx'
+    path.write_bytes(workbook_bytes(ROWS))
+    return str(path)
+
+
+def _bump_mtime(path, seconds=10):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 10**9))
+
+
+def test_get_parses_once_and_counts_hits(workbook_path):
+    store = data_store.WorkbookStore(workbook_path)
+    first = store.get()
+    assert store.get() is first
+    assert store.stats['misses'] == 1
+    assert store.stats['hits'] == 1
+    assert store.stats['loads'] == 1
+    assert first.length == len(ROWS)
+
+
+def test_invalidate_rereads_the_file(workbook_path):
+    store = data_store.WorkbookStore(workbook_path)
+    first = store.get()
+    store.invalidate()
+    second = store.get()
+    assert second is not first
+    assert second.sha256 == first.sha256
+    assert store.stats['misses'] == 2
+
+
+def test_changed_content_is_reparsed(workbook_path):
+    store = data_store.WorkbookStore(workbook_path)
+    first = store.get()
+    with open(workbook_path, 'wb') as f:
+        f.write(workbook_bytes(ROWS[:2]))
+    _bump_mtime(workbook_path)
+    second = store.get()
+    assert second.sha256 != first.sha256
+    assert second.length == 2
+
+
+def test_touched_but_unchanged_keeps_columns(workbook_path):
+    store = data_store.WorkbookStore(workbook_path)
+    first = store.get()
+    _bump_mtime(workbook_path)
+    second = store.get()
+    assert second is not first
+    assert second.columns is first.columns
+    assert store.stats['loads'] + store.stats['snapshot_loads'] == 1
+
+
+def test_new_store_loads_the_snapshot(workbook_path):
+    parsed = data_store.WorkbookStore(workbook_path).get()
+    assert os.path.exists(data_store.snapshot_path(workbook_path))
+
+    store = data_store.WorkbookStore(workbook_path)
+    loaded = store.get()
+    assert store.stats['snapshot_loads'] == 1
+    assert store.stats['loads'] == 0
+    assert loaded.header == parsed.header
+    assert loaded.column('Division') == parsed.column('Division')
+    assert loaded.names() == parsed.names()
+
+
+def test_snapshot_stats(workbook_path):
+    store = data_store.WorkbookStore(workbook_path)
+    assert store.snapshot_stats()['sha256'] is None
+    dataset = store.get()
+    stats = store.snapshot_stats()
+    assert stats['sha256'] == dataset.sha256
+    assert stats['version'] == 0
+    assert stats['misses'] == 1
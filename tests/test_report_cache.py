@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+import pytest
+from openpyxl import load_workbook
+
+import data_store
+import report_cache
+from conftest import workbook_bytes
+
+
+@pytest.fixture
+def cache(tmp_path):
+    path = tmp_path / 'Solution List.xlsx'
+    path.write_bytes(workbook_bytes([
+        ('Kreeda', 'Sewing Robot', 'Automation', 'R&D', 1.5, 10, 0),
+        ('Linea Aqua', 'Dye Saver', 'Sustainability', 'Commercialized', 0, 20, 1),
+    ]))
+    return report_cache.ReportCache(data_store.WorkbookStore(str(path)), str(tmp_path / 'cache'))
+
+
+def _fake_build(monkeypatch, fail=False, seconds=0.2):
+    """Replace the child-process build with a slow write; returns the list of built paths"""
+    calls = []
+
+    def run_build(self, name, path, sha256, options):
+        calls.append(path)
+        time.sleep(seconds)
+        if fail:
+            raise report_cache.BuildError('boom')
+        with open(path, 'wb') as f:
+            f.write(b'report')
+
+    monkeypatch.setattr(report_cache.ReportCache, '_run_build', run_build)
+    return calls
+
+
+def _get_concurrently(cache, count=8):
+    results, errors = [], []
+    options = report_cache.parse_options('dashboard', {})
+
+    def get():
+        try:
+            results.append(cache.get('dashboard', options)[0])
+        except report_cache.BuildError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=get) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_requests_share_one_build(cache, monkeypatch):
+    calls = _fake_build(monkeypatch)
+    results, errors = _get_concurrently(cache)
+    assert not errors
+    assert len(calls) == 1
+    assert set(results) == {calls[0]}
+    assert not cache._builds
+
+    # Cached now: no further builds
+    cache.get('dashboard', report_cache.parse_options('dashboard', {}))
+    assert len(calls) == 1
+
+
+def test_failed_build_fails_every_waiter(cache, monkeypatch):
+    calls = _fake_build(monkeypatch, fail=True)
+    results, errors = _get_concurrently(cache)
+    assert not results
+    assert len(errors) == 8
+    assert len(calls) == 1
+    assert not cache._builds
+
+
+def test_options_get_their_own_file(cache, monkeypatch):
+    calls = _fake_build(monkeypatch, seconds=0)
+    streamed, _ = cache.get('dashboard', report_cache.parse_options('dashboard', {'stream': 'true'}))
+    default, _ = cache.get('dashboard', report_cache.parse_options('dashboard', {}))
+    assert streamed != default
+    assert calls == [streamed, default]
+
+
+def test_prune_keeps_only_the_current_version(cache, monkeypatch):
+    _fake_build(monkeypatch, seconds=0)
+    options = report_cache.parse_options('dashboard', {})
+    os.makedirs(cache.cache_dir)
+    stale = os.path.join(cache.cache_dir, report_cache.cache_name('dashboard', '0' * 64, options))
+    other = os.path.join(cache.cache_dir, report_cache.cache_name('dynamic', '0' * 64, {'stream': False, 'precompute': True}))
+    for path in (stale, stale + '.lock', other):
+        open(path, 'wb').close()
+
+    path, _ = cache.get('dashboard', options)
+    assert sorted(os.listdir(cache.cache_dir)) == sorted([os.path.basename(other), os.path.basename(path),
+                                                         os.path.basename(path) + '.lock'])
+
+
+def test_parse_options():
+    assert report_cache.parse_options('dynamic', {}) == {'stream': False, 'precompute': True}
+    assert report_cache.parse_options('dynamic', {'stream': 'Yes', 'precompute': '0', 'other': '1'}) == {
+        'stream': True, 'precompute': False}
+
+
+def test_builds_in_a_child_process(cache):
+    path, dataset = cache.get('dashboard', report_cache.parse_options('dashboard', {}))
+    assert os.path.basename(path).startswith(f'dashboard-{dataset.sha256[:16]}-')
+    wb = load_workbook(path, read_only=True)
+    assert wb.sheetnames
+    wb.close()
@@ -0,0 +1,37 @@
+import pytest
+
+import request_metrics
+from conftest import REPO_DIR
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+    import server
+    return server.app.test_client()
+
+
+def _redirects():
+    return {labels[0]: value for (name, labels), value in request_metrics.registry.counters.items()
+            if name == 'http_login_redirects_total'}
+
+
+def test_only_protected_routes_count_as_login_redirects(client):
+    before = _redirects()
+    for path in ('/', '/download-excel', '/logout', '/login'):
+        with client.get(path) as response:
+            assert response.status_code in (200, 302)
+    after = _redirects()
+    counted = {route: value - before.get(route, 0) for route, value in after.items()}
+    assert {route: n for route, n in counted.items() if n} == {'/': 1, '/download-excel': 1}
+
+
+def test_metrics_need_a_login_or_the_token(client, monkeypatch):
+    monkeypatch.setenv(request_metrics.METRICS_TOKEN_ENV, 'secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'text/plain; version=0.0.4; charset=utf-8'
+    assert 'http_login_redirects_total' in response.get_data(as_text=True)
@@ -0,0 +1,79 @@
+import csv
+import io
+import os
+
+import numpy as np
+from openpyxl import load_workbook
+from werkzeug.datastructures import MultiDict
+
+import row_export
+from conftest import make_dataset
+
+ROWS = [
+    ('Kreeda', 'Sewing Robot', 'Automation', 'R&D', 1.5, 10, 0),
+    ('Kreeda', 'Smart Cutting', 'Automation', 'Trial', 2, None, 5),
+    ('Linea Aqua', 'Dye Saver', 'Sustainability', 'Commercialized', None, 20, 1),
+    ('Linea Aqua', 'Water Loop', 'Sustainability', 'R&D', 0.5, '3 hrs', 0),
+    (None, 'Orphan Idea', 'Automation', 'Trial', 1, 0, 0),
+]
+
+
+def _csv(dataset, rows):
+    return ''.join(row_export.iter_csv(dataset, rows))
+
+
+def test_select_rows_applies_filters_then_drill_through():
+    dataset = make_dataset(ROWS)
+    assert row_export.select_rows(dataset, MultiDict()).tolist() == [0, 1, 2, 3, 4]
+    assert row_export.select_rows(dataset, MultiDict({'focus': 'Automation'})).tolist() == [0, 1, 4]
+    args = MultiDict({'focus': 'Automation', 'drill_stage': 'Trial'})
+    assert row_export.select_rows(dataset, args).tolist() == [1, 4]
+
+
+def test_empty_drill_through_keeps_the_filtered_rows():
+    dataset = make_dataset(ROWS)
+    args = MultiDict({'division': 'Kreeda', 'drill_division': 'Linea Aqua'})
+    assert row_export.select_rows(dataset, args).tolist() == [0, 1]
+
+
+def test_csv_matches_the_browser_export():
+    dataset = make_dataset(ROWS)
+    text = _csv(dataset, np.array([0, 1, 3]))
+    assert text.splitlines() == [
+        '"Solution Name","Division","Focus Area","Stage","SMV Unlock","OH Reduction","Other Savings","Total"',
+        '"Sewing Robot","Kreeda","Automation","R&D","1.5","10","0","11.5"',
+        '"Smart Cutting","Kreeda","Automation","Trial","2","0","5","7"',
+        '"Water Loop","Linea Aqua","Sustainability","R&D","0.5","3","0","3.5"',
+    ]
+
+
+def test_csv_of_no_rows_is_the_header():
+    text = _csv(make_dataset(ROWS), np.empty(0, dtype=np.intp))
+    assert text == ','.join(f'"{h}"' for h in row_export.HEADERS) + '\n'
+
+
+def test_csv_chunks(monkeypatch):
+    monkeypatch.setattr(row_export, 'CHUNK_ROWS', 2)
+    dataset = make_dataset(ROWS)
+    chunks = list(row_export.iter_csv(dataset, np.arange(5)))
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO(''.join(chunks))))
+    assert [row[0] for row in rows[1:]] == ['Sewing Robot', 'Smart Cutting', 'Dye Saver', 'Water Loop', 'Orphan Idea']
+
+
+def test_xlsx_export():
+    dataset = make_dataset(ROWS)
+    path = row_export.write_xlsx(dataset, np.array([2, 4]))
+    try:
+        wb = load_workbook(path, read_only=True)
+        values = list(wb['Export'].iter_rows(values_only=True))
+        wb.close()
+    finally:
+        chunks = list(row_export.iter_file(path))
+    assert values == [
+        row_export.HEADERS,
+        ('Dye Saver', 'Linea Aqua', 'Sustainability', 'Commercialized', 0, 20, 1, 21),
+        ('Orphan Idea', 'Unspecified', 'Automation', 'Trial', 1, 0, 0, 1),
+    ]
+    assert b''.join(chunks)[:2] == b'PK'
+    assert not os.path.exists(path)
@@ -0,0 +1,132 @@
+import os
+
+import row_sync
+from conftest import make_dataset
+
+ROWS = [
+    ('Kreeda', 'Sewing Robot', 'Automation', 'R&D', 1.5, 10, 0),
+    ('Kreeda', 'Smart Cutting', 'Automation', 'Trial', 2, None, 5),
+    ('Linea Aqua', 'Dye Saver', 'Sustainability', 'Commercialized', None, 20, 1),
+    (' Linea Aqua ', 'Water Loop', 'Sustainability', 'R&D', 0.5, 3, 0),
+    (None, 'Orphan Idea', 'Automation', 'Trial', 1, 0, 0),
+]
+
+
+def _apply(rows, delta):
+    """What applyRowDelta() in data_model.js does with a delta"""
+    removed = set(delta['removed'])
+    changed = {row['_key']: row for row in delta['changed']}
+    patched = [changed.get(row['_key'], row) for row in rows if row['_key'] not in removed] + delta['added']
+    if 'order' in delta:
+        by_key = {row['_key']: row for row in patched}
+        patched = [by_key[key] for key in delta['order']]
+    return patched
+
+
+def _sync(old_rows, new_rows):
+    history = row_sync.RowHistory()
+    first = history.delta(make_dataset(old_rows))
+    new = make_dataset(new_rows, version=1)
+    return first, history.delta(new, first['version']), row_sync.RowHistory().delta(new)
+
+
+def test_unknown_version_gets_every_row():
+    delta = row_sync.RowHistory().delta(make_dataset(ROWS), since='0-unknown')
+    assert delta['full'] is True
+    assert [row['_key'] for row in delta['rows']] == [
+        'Kreeda|Sewing Robot', 'Kreeda|Smart Cutting', 'Linea Aqua|Dye Saver',
+        'Linea Aqua|Water Loop', 'Unspecified|Orphan Idea']
+    # Blank cells come through as '' like sheet_to_json(..., { defval: "" })
+    assert delta['rows'][1]['OH Reduction'] == ''
+
+
+def test_same_version_is_an_empty_delta():
+    history = row_sync.RowHistory()
+    dataset = make_dataset(ROWS)
+    first = history.delta(dataset)
+    delta = history.delta(dataset, first['version'])
+    assert delta == {'version': first['version'], 'full': False, 'added': [], 'changed': [], 'removed': []}
+
+
+def test_duplicate_names_keep_their_own_keys():
+    rows = [ROWS[0], ROWS[0], ROWS[0]]
+    keys = list(row_sync.snapshot(make_dataset(rows)))
+    assert keys == ['Kreeda|Sewing Robot', 'Kreeda|Sewing Robot#2', 'Kreeda|Sewing Robot#3']
+
+
+def test_changed_and_appended_rows():
+    edited = ROWS[:1] + [ROWS[1][:4] + (9, 9, 9)] + ROWS[2:] + [('Kreeda', 'New', 'Automation', 'R&D', 1, 1, 1)]
+    first, delta, full = _sync(ROWS, edited)
+    assert [row['_key'] for row in delta['changed']] == ['Kreeda|Smart Cutting']
+    assert [row['_key'] for row in delta['added']] == ['Kreeda|New']
+    assert delta['removed'] == []
+    assert 'order' not in delta
+    assert _apply(first['rows'], delta) == full['rows']
+
+
+def test_removed_rows():
+    first, delta, full = _sync(ROWS, ROWS[1:])
+    assert delta['removed'] == ['Kreeda|Sewing Robot']
+    assert 'order' not in delta
+    assert _apply(first['rows'], delta) == full['rows']
+
+
+def test_rename_keeps_the_row_in_place():
+    renamed = ROWS[:2] + [('Linea Aqua', 'Dye Saver 2') + ROWS[2][2:]] + ROWS[3:]
+    first, delta, full = _sync(ROWS, renamed)
+    assert delta['removed'] == ['Linea Aqua|Dye Saver']
+    assert [row['_key'] for row in delta['added']] == ['Linea Aqua|Dye Saver 2']
+    assert delta['order'] == [row['_key'] for row in full['rows']]
+    assert _apply(first['rows'], delta) == full['rows']
+
+
+def test_pure_reorder_sends_the_order():
+    first, delta, full = _sync(ROWS, ROWS[::-1])
+    assert (delta['added'], delta['changed'], delta['removed']) == ([], [], [])
+    assert delta['order'] == [row['_key'] for row in full['rows']]
+    assert _apply(first['rows'], delta) == full['rows']
+
+
+def test_history_is_bounded():
+    history = row_sync.RowHistory(size=2)
+    first = history.delta(make_dataset(ROWS, version=0))
+    history.delta(make_dataset(ROWS[:2], version=1))
+    history.delta(make_dataset(ROWS[:3], version=2))
+    assert history.delta(make_dataset(ROWS[:3], version=2), first['version'])['full'] is True
+
+
+def test_workers_share_snapshots_through_the_directory(tmp_path):
+    directory = str(tmp_path / 'rows')
+    first = row_sync.RowHistory(directory=directory).delta(make_dataset(ROWS))
+
+    # Another worker, which never served the first version
+    other = row_sync.RowHistory(directory=directory)
+    new = make_dataset(ROWS[1:], version=1)
+    delta = other.delta(new, first['version'])
+    assert delta['full'] is False
+    assert delta['removed'] == ['Kreeda|Sewing Robot']
+    assert _apply(first['rows'], delta) == row_sync.RowHistory().delta(new)['rows']
+
+
+def test_without_a_directory_other_workers_send_every_row():
+    first = row_sync.RowHistory().delta(make_dataset(ROWS))
+    delta = row_sync.RowHistory().delta(make_dataset(ROWS[1:], version=1), first['version'])
+    assert delta['full'] is True
+    assert len(delta['rows']) == 4
+
+
+def test_saved_snapshots_are_bounded(tmp_path):
+    directory = str(tmp_path / 'rows')
+    history = row_sync.RowHistory(directory=directory)
+    versions = [history.delta(make_dataset(ROWS[:n], version=n))['version'] for n in (1, 2, 3)]
+    for i, version in enumerate(versions):
+        os.utime(os.path.join(directory, f'{version}.json'), (1_000_000_000 + i,) * 2)
+    history.size = 2
+    history._prune()
+    assert sorted(os.listdir(directory)) == sorted(f'{v}.json' for v in versions[1:])
+
+
+def test_only_version_tokens_are_read_from_disk(tmp_path):
+    (tmp_path / 'secret.json').write_text('[{"_key": "x"}]')
+    history = row_sync.RowHistory(directory=str(tmp_path / 'rows'))
+    assert history.delta(make_dataset(ROWS), since='../secret')['full'] is True
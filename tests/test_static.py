@@ -0,0 +1,41 @@
+import pytest
+
+import build_assets
+from conftest import REPO_DIR
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+    import server
+    return server.app.test_client()
+
+
+def _login(client):
+    with client.session_transaction() as sess:
+        sess['logged_in'] = True
+        sess['username'] = 'test'
+
+
+@pytest.mark.parametrize('path', ['/server.py', '/Solution List.xlsx', '/Solution List.xlsx.npz',
+                                  '/requirements.txt', '/templates/login.html'])
+def test_other_files_need_a_login(client, path):
+    response = client.get(path)
+    assert response.status_code in (302, 401)
+    if response.status_code == 302:
+        assert response.headers['Location'].endswith('/login')
+
+
+def test_built_bundles_and_pages_are_public(client):
+    manifest = build_assets.ensure_built(REPO_DIR)
+    for name in ('app.js', 'styles.css', manifest['files']['app.js']['name'], 'login.html'):
+        assert client.get(f'/{name}').status_code == 200, name
+
+    bundle = client.get('/' + manifest['files']['app.js']['name'], headers={'Accept-Encoding': 'gzip'})
+    assert bundle.headers['Content-Encoding'] == 'gzip'
+
+
+def test_logged_in_users_reach_other_files(client):
+    _login(client)
+    assert client.get('/requirements.txt').status_code == 200
+    assert client.get('/no-such-file.txt').status_code == 404
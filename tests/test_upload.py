@@ -0,0 +1,99 @@
+import hashlib
+import io
+import os
+import re
+import zipfile
+
+import pytest
+from openpyxl import Workbook
+
+import data_store
+from conftest import workbook_bytes
+
+ROWS = [
+    ('Kreeda', 'Sewing Robot', 'Automation', 'R&D', 1.5, 10, 0),
+    ('Kreeda', 'Smart Cutting', 'Automation', 'Trial', 2, 4, 5),
+    ('Linea Aqua', 'Dye Saver', 'Sustainability', 'Commercialized', 0, 20, 1),
+]
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    path = tmp_path / 'Solution List.xlsx'
+    path.write_bytes(workbook_bytes(ROWS[1:]))
+    return str(path)
+
+
+def _without_worksheets():
+    """A workbook whose <sheets> list is empty: it opens, but has no worksheets"""
+    buffer = io.BytesIO()
+    Workbook().save(buffer)
+    source = zipfile.ZipFile(io.BytesIO(buffer.getvalue()))
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w') as z:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename == 'xl/workbook.xml':
+                data = re.sub(rb'<sheets>.*?</sheets>', b'<sheets/>', data)
+            z.writestr(item, data)
+    return out.getvalue()
+
+
+def _leftovers(path):
+    directory = os.path.dirname(path)
+    return [name for name in os.listdir(directory) if name.startswith('.')]
+
+
+def test_replace_installs_the_upload_and_bumps_the_version(workbook_path):
+    store = data_store.WorkbookStore(workbook_path)
+    assert store.get().version == 0
+
+    content = workbook_bytes(ROWS)
+    assert data_store.replace_workbook(workbook_path, io.BytesIO(content), chunk_size=1000) == 1
+    with open(workbook_path, 'rb') as f:
+        assert f.read() == content
+    assert data_store.read_version(workbook_path) == 1
+
+    dataset = store.get()
+    assert dataset.version == 1
+    assert dataset.length == 3
+    assert dataset.sha256 == hashlib.sha256(content).hexdigest()
+    # The upload's snapshot is already in place: no xlsx parse on the next read
+    assert store.stats['snapshot_loads'] == 1
+
+    assert store.replace(io.BytesIO(workbook_bytes(ROWS[:1]))) == 2
+    assert store.get().version == 2
+    assert not _leftovers(workbook_path)
+
+
+def test_replace_keeps_the_file_mode(workbook_path):
+    os.chmod(workbook_path, 0o640)
+    data_store.replace_workbook(workbook_path, io.BytesIO(workbook_bytes(ROWS[:1])))
+    assert os.stat(workbook_path).st_mode & 0o777 == 0o640
+
+
+@pytest.mark.parametrize('content, message', [
+    (b'not a workbook', 'valid Excel workbook'),
+    (_without_worksheets(), 'valid Excel workbook'),
+    (workbook_bytes(ROWS, header=('Division', 'Solution Name', 'Stage')), 'Focus Area'),
+])
+def test_rejected_upload_leaves_the_live_file(workbook_path, content, message):
+    with open(workbook_path, 'rb') as f:
+        before = f.read()
+
+    with pytest.raises(data_store.UploadError, match=message):
+        data_store.replace_workbook(workbook_path, io.BytesIO(content))
+
+    with open(workbook_path, 'rb') as f:
+        assert f.read() == before
+    assert data_store.read_version(workbook_path) == 0
+    assert not _leftovers(workbook_path)
+
+
+def test_missing_columns_are_listed(tmp_path):
+    path = tmp_path / 'partial.xlsx'
+    path.write_bytes(workbook_bytes(rows=[], header=('Division', 'SMV Unlock')))
+    with pytest.raises(data_store.UploadError) as e:
+        data_store.validate_workbook(str(path))
+    assert str(e.value) == ('Missing required columns: Solution Name, Focus Area, Stage, '
+                            'OH Reduction, Other Savings')